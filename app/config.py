@@ -6,12 +6,82 @@ class Settings(BaseSettings):
     # MongoDB
     mongodb_url: str = "mongodb://localhost:27017"
     mongodb_db_name: str = "idocracy"
+    mongodb_max_pool_size: int = 100
+    mongodb_min_pool_size: int = 0
+    mongodb_wait_queue_timeout_ms: Optional[int] = None  # None = wait for a connection as long as the request runs
+    mongodb_server_selection_timeout_ms: int = 5000
+    mongodb_compressors: str = ""  # e.g. "zstd,snappy,zlib" (zstd/snappy need their packages)
+    mongodb_secondary_read_preference: str = "secondaryPreferred"  # for secondary-eligible reads only
+    readiness_timeout_seconds: float = 2.0
+    
+    # Profiling and the slow-request log
+    slow_request_ms: float = 1000.0
+    profiling_sample_rate: float = 0.0  # fraction of requests run under cProfile
+    profiling_secret: Optional[str] = None  # HMAC key for on-demand X-Profile headers
+    profiling_signature_max_age_seconds: int = 300
+    profiling_top_frames: int = 15
     
     # JWT
     secret_key: str = "u5qjPZJ+9tAjjGv5h9sUCBekHY7V4TnlfyPuAnRUl6I="
-    algorithm: str = "HS256"
+    algorithm: str = "HS256"  # HS* signs with secret_key; RS*/ES*/EdDSA use signing_keys_dir
+    jwt_backend: str = "jose"  # "jose" or "pyjwt"
+    signing_keys_dir: Optional[str] = None
+    signing_key_id: Optional[str] = None
+    jwks_cache_max_age: int = 300
     access_token_expire_minutes: int = 30
     refresh_token_expire_days: int = 7
+    token_cache_size: int = 10000
+    token_cache_ttl_seconds: int = 60
+    token_verify_batch_max: int = 500
+    
+    # Caches (per process)
+    membership_cache_size: int = 50000
+    membership_cache_ttl_seconds: int = 60
+    entity_cache_size: int = 10000
+    entity_cache_ttl_seconds: int = 30
+    entity_cache_negative_ttl_seconds: int = 5
+    
+    # Password hashing
+    password_hash_workers: int = 0  # 0 = one worker per CPU core
+    password_hash_queue_size: int = 64
+    bcrypt_rounds: Optional[int] = None  # None = calibrate at startup
+    bcrypt_target_ms: float = 100.0  # target single-core verify latency
+    bcrypt_min_rounds: int = 10
+    bcrypt_max_rounds: int = 15
+    bcrypt_rehash_tolerance: int = 1  # rounds above target tolerated before rehashing
+    
+    # Admission control for login, register and client credentials
+    login_ip_rate_per_minute: float = 30
+    login_ip_burst: int = 10
+    login_account_rate_per_minute: float = 10
+    login_account_burst: int = 5
+    register_ip_rate_per_minute: float = 10
+    register_ip_burst: int = 5
+    client_credentials_rate_per_minute: float = 120
+    client_credentials_burst: int = 20
+    rate_limit_max_keys: int = 100000  # per limiter; least recently seen keys are dropped first
+    admission_max_pending_hashes: int = 0  # 0 = hasher workers + half the hasher queue
+    trust_forwarded_for: bool = False  # take the client IP from X-Forwarded-For (behind a proxy only)
+    
+    # Maintenance
+    maintenance_enabled: bool = True
+    maintenance_batch_size: int = 1000  # documents removed per job tick
+    maintenance_jitter: float = 0.1  # +/- fraction of the interval
+    token_sweep_interval_seconds: int = 300
+    membership_compaction_interval_seconds: int = 3600
+    
+    # Bulk operations
+    bulk_import_max_rows: int = 50000
+    bulk_import_max_bytes: int = 20 * 1024 * 1024  # request bodies above this get a 413
+    bulk_import_chunk_size: int = 1000  # rows per bulk_write
+    bulk_membership_max_ops: int = 10000
+    
+    # Serialization
+    fast_serialization: bool = True  # list endpoints encode DB rows directly instead of re-validating them
+    
+    # Pagination
+    default_page_size: int = 100
+    max_page_size: int = 1000
     
     # App
     debug: bool = True
@@ -1,14 +1,163 @@
+import threading
+import time
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReadPreference, monitoring
 from app.config import settings
+from app.utils.metrics import mongodb_command_duration, mongodb_command_failures
+from app.utils.profiling import command_collection, command_trace
 
 client = None
 database = None
+secondary_database = None
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Connection pool counters, fed by pymongo's pool monitoring events.
+
+    Motor checks connections out on its executor threads, so the start of each
+    checkout is remembered per thread to measure how long it waited.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.open = 0
+        self.checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def _waited(self) -> float:
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        return (time.perf_counter() - started) * 1000 if started else 0.0
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        waited = self._waited()
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+            self.total_wait_ms += waited
+            self.max_wait_ms = max(self.max_wait_ms, waited)
+
+    def connection_check_out_failed(self, event):
+        waited = self._waited()
+        with self._lock:
+            self.checkout_failures += 1
+            self.total_wait_ms += waited
+            self.max_wait_ms = max(self.max_wait_ms, waited)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open -= 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def stats(self) -> dict:
+        attempts = self.checkouts + self.checkout_failures
+        return {
+            "max_pool_size": settings.mongodb_max_pool_size,
+            "open": self.open,
+            "checked_out": self.checked_out,
+            "checkouts": self.checkouts,
+            "checkout_failures": self.checkout_failures,
+            "avg_wait_ms": round(self.total_wait_ms / attempts, 3) if attempts else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 3),
+        }
+
+
+class CommandTimings(monitoring.CommandListener):
+    """Feeds MongoDB command latencies into the metrics registry.
+
+    Only started events carry the command document, so the collection is
+    remembered per request ID until the command finishes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._collections = {}
+
+    def started(self, event):
+        with self._lock:
+            self._collections[(event.connection_id, event.request_id)] = command_collection(event)
+
+    def _finished(self, event) -> str:
+        with self._lock:
+            return self._collections.pop((event.connection_id, event.request_id), "")
+
+    def succeeded(self, event):
+        collection = self._finished(event)
+        mongodb_command_duration.observe(
+            event.duration_micros / 1e6, collection=collection, command=event.command_name
+        )
+
+    def failed(self, event):
+        collection = self._finished(event)
+        mongodb_command_duration.observe(
+            event.duration_micros / 1e6, collection=collection, command=event.command_name
+        )
+        mongodb_command_failures.inc(collection=collection, command=event.command_name)
+
+
+pool_stats = PoolStats()
+command_timings = CommandTimings()
+
+
+def client_options() -> dict:
+    options = {
+        "maxPoolSize": settings.mongodb_max_pool_size,
+        "minPoolSize": settings.mongodb_min_pool_size,
+        "serverSelectionTimeoutMS": settings.mongodb_server_selection_timeout_ms,
+        "event_listeners": [pool_stats, command_timings, command_trace],
+    }
+    if settings.mongodb_wait_queue_timeout_ms:
+        options["waitQueueTimeoutMS"] = settings.mongodb_wait_queue_timeout_ms
+    if settings.mongodb_compressors:
+        options["compressors"] = settings.mongodb_compressors
+    return options
 
 
 async def connect_to_mongo():
-    global client, database
-    client = AsyncIOMotorClient(settings.mongodb_url)
+    global client, database, secondary_database
+    client = AsyncIOMotorClient(settings.mongodb_url, **client_options())
     database = client[settings.mongodb_db_name]
+    read_preference = READ_PREFERENCES.get(settings.mongodb_secondary_read_preference)
+    if read_preference is None:
+        raise ValueError(f"Unknown read preference: {settings.mongodb_secondary_read_preference}")
+    secondary_database = client.get_database(settings.mongodb_db_name, read_preference=read_preference)
 
 
 async def close_mongo_connection():
@@ -17,5 +166,13 @@ async def close_mongo_connection():
         client.close()
 
 
-def get_database():
-    return database 
\ No newline at end of file
+def get_database(secondary_ok: bool = False):
+    """Database handle; secondary_ok routes reads by MONGODB_SECONDARY_READ_PREFERENCE.
+
+    Only pass secondary_ok for reads that tolerate replication lag (listings,
+    dashboards, exports). Authentication and authorization reads stay on the
+    primary.
+    """
+    if secondary_ok and secondary_database is not None:
+        return secondary_database
+    return database
\ No newline at end of file
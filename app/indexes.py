@@ -0,0 +1,153 @@
+import logging
+from datetime import datetime
+from typing import Dict, List, Set
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from app.repositories import apps, memberships, users
+
+logger = logging.getLogger(__name__)
+
+# Every index the app relies on, per collection. Applied idempotently at startup.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        # Keyset pagination of GET /users/, unfiltered and by role
+        IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)], name="created_at_id"),
+        IndexModel([("roles", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)], name="roles_created_at_id"),
+    ],
+    "apps": [
+        IndexModel([("client_id", ASCENDING)], name="client_id_unique", unique=True),
+        # Keyset pagination of GET /apps/, unfiltered and by creator
+        IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)], name="created_at_id"),
+        IndexModel([("created_by", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)], name="created_by_created_at_id"),
+    ],
+    "app_users": [
+        IndexModel([("user_id", ASCENDING), ("app_id", ASCENDING)], name="user_app_unique", unique=True),
+        # Also serves keyset pagination of an app's members
+        IndexModel([("app_id", ASCENDING), ("_id", ASCENDING)], name="app_id_id"),
+        # Incremental membership exports
+        IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)], name="created_at_id"),
+    ],
+    "tokens": [
+        IndexModel([("token", ASCENDING)], name="token_unique", unique=True),
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+        # Revoking a whole family when a used refresh token is replayed
+        IndexModel([("family_id", ASCENDING)], name="family_id"),
+        # Mongo removes refresh tokens on its own once expires_at has passed
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+# Duplicate handling on create paths relies on these; the app must not run without them
+UNIQUE_INDEXES: Set[str] = {
+    f"{collection_name}.{model.document['name']}"
+    for collection_name, models in INDEXES.items()
+    for model in models
+    if model.document.get("unique")
+}
+
+# Representative queries issued by the repositories, used to check query plans.
+# "covered" shapes must be answered from the index alone, without a FETCH.
+QUERY_SHAPES: List[dict] = [
+    {"collection": "users", "filter": {"email": "user@example.com"}, "projection": users.CREDENTIALS},
+    {"collection": "users", "filter": {"_id": {"$in": ["x"]}}, "projection": users.ID_ONLY, "covered": True},
+    {
+        "collection": "users",
+        "filter": {"email": {"$in": ["user@example.com"]}},
+        "projection": users.EMAIL_ONLY,
+        "covered": True,
+    },
+    {"collection": "apps", "filter": {"client_id": "client_x"}},
+    {"collection": "apps", "filter": {"_id": "x"}, "projection": apps.OWNER},
+    {"collection": "app_users", "filter": {"user_id": "x", "app_id": "x"}},
+    {"collection": "app_users", "filter": {"user_id": "x"}, "projection": memberships.APP_ROLES},
+    {
+        "collection": "app_users",
+        "filter": {"user_id": {"$in": ["x"]}, "app_id": "x"},
+        "projection": memberships.USER_IDS,
+        "covered": True,
+    },
+    {"collection": "app_users", "filter": {"app_id": "x"}},
+    {"collection": "tokens", "filter": {"token": "x"}},
+    {"collection": "tokens", "filter": {"user_id": "x"}},
+    {"collection": "tokens", "filter": {"family_id": "x"}},
+    {"collection": "tokens", "filter": {"expires_at": {"$lt": datetime(1970, 1, 1)}}},
+]
+
+
+async def ensure_indexes(db) -> List[str]:
+    """Create every declared index; returns the names that could not be created.
+
+    Creating an index that already exists with the same spec is a no-op, so
+    this is safe to run on every startup. A failure (e.g. duplicate emails
+    blocking a unique index, or an existing index with different options) is
+    logged and does not stop the others from being applied. Callers decide
+    what a failure means; startup refuses to continue without UNIQUE_INDEXES.
+    """
+    failed = []
+    for collection_name, models in INDEXES.items():
+        for model in models:
+            try:
+                await db[collection_name].create_indexes([model])
+            except OperationFailure as e:
+                name = model.document["name"]
+                logger.error("Could not create index %s.%s: %s", collection_name, name, e)
+                failed.append(f"{collection_name}.{name}")
+    return failed
+
+
+def _plan_stages(plan: dict) -> List[str]:
+    stages = [plan.get("stage")]
+    for child in plan.get("inputStages", []) + [plan.get("inputStage")]:
+        if child:
+            stages.extend(_plan_stages(child))
+    return stages
+
+
+async def index_report(db, slow_ratio: float = 10.0) -> dict:
+    """Compare the declared indexes with what Mongo has and how it uses them.
+
+    Reports missing declared indexes, undeclared ones, indexes with no
+    recorded use since the server started, and query shapes whose plan is a
+    collection scan or examines many more documents than it returns, and
+    shapes meant to be covered by an index whose plan still fetches documents.
+    """
+    report = {"missing": [], "undeclared": [], "unused": [], "slow_plans": [], "uncovered": []}
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+        declared = {model.document["name"] for model in models}
+        for name in sorted(declared - set(existing)):
+            report["missing"].append(f"{collection_name}.{name}")
+        for name in sorted(set(existing) - declared - {"_id_"}):
+            report["undeclared"].append(f"{collection_name}.{name}")
+
+        async for stats in collection.aggregate([{"$indexStats": {}}]):
+            if stats["name"] != "_id_" and stats["accesses"]["ops"] == 0:
+                report["unused"].append(f"{collection_name}.{stats['name']}")
+
+    for shape in QUERY_SHAPES:
+        explain = await db[shape["collection"]].find(shape["filter"], shape.get("projection")).explain()
+        winning_plan = explain["queryPlanner"]["winningPlan"]
+        # Slot-based engine wraps the classic plan under queryPlan
+        stages = _plan_stages(winning_plan.get("queryPlan", winning_plan))
+        execution = explain.get("executionStats", {})
+        examined = execution.get("totalDocsExamined", 0)
+        returned = execution.get("nReturned", 0)
+        if "COLLSCAN" in stages or examined > slow_ratio * max(returned, 1):
+            report["slow_plans"].append({
+                "collection": shape["collection"],
+                "filter": shape["filter"],
+                "stages": [stage for stage in stages if stage],
+                "docs_examined": examined,
+                "returned": returned,
+                "millis": execution.get("executionTimeMillis"),
+            })
+        if shape.get("covered") and "FETCH" in stages:
+            report["uncovered"].append({
+                "collection": shape["collection"],
+                "filter": shape["filter"],
+                "projection": shape["projection"],
+                "stages": [stage for stage in stages if stage],
+            })
+    return report
\ No newline at end of file
@@ -1,17 +1,43 @@
+import asyncio
+import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.config import settings
-from app.database import connect_to_mongo, close_mongo_connection
-from app.routers import auth, users, apps, app_users, token, sso
+from app.database import connect_to_mongo, close_mongo_connection, get_database, pool_stats
+from app.indexes import UNIQUE_INDEXES, ensure_indexes
+from app.scheduler import scheduler
+from app.routers import auth, users, apps, app_users, token, sso, jwks, export
+from app.utils.hashing import hasher
+from app.utils.cache import caches
+from app.utils.keys import key_ring
+from app.utils.metrics import CONTENT_TYPE, MetricsMiddleware, registry, stats_metrics
+from app.utils.profiling import ProfilingMiddleware
+from app.utils.rate_limit import admission
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await connect_to_mongo()
+    failed = await ensure_indexes(get_database())
+    missing_unique = sorted(UNIQUE_INDEXES.intersection(failed))
+    if missing_unique:
+        await close_mongo_connection()
+        raise RuntimeError(
+            f"Could not build unique indexes {', '.join(missing_unique)}; "
+            "refusing to start without duplicate protection"
+        )
+    key_ring.load()
+    await hasher.calibrate()
+    hasher.start()
+    if settings.maintenance_enabled:
+        scheduler.start()
     yield
     # Shutdown
+    await scheduler.stop()
+    hasher.shutdown()
     await close_mongo_connection()
 
 
@@ -31,6 +57,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost (added last), so they time everything including CORS handling
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilingMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix=settings.api_v1_str)
 app.include_router(users.router, prefix=settings.api_v1_str)
@@ -38,6 +68,8 @@ app.include_router(apps.router, prefix=settings.api_v1_str)
 app.include_router(app_users.router, prefix=settings.api_v1_str)
 app.include_router(token.router, prefix=settings.api_v1_str)
 app.include_router(sso.router, prefix=settings.api_v1_str)
+app.include_router(export.router, prefix=settings.api_v1_str)
+app.include_router(jwks.router)
 
 @app.get("/")
 async def root():
@@ -50,4 +82,52 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"} 
\ No newline at end of file
+    """Liveness: the process is up and serving requests"""
+    return {"status": "healthy"}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness: the database answers a ping within the timeout"""
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(get_database().command("ping"), settings.readiness_timeout_seconds)
+    except Exception as e:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={
+                "status": "unavailable",
+                "database": {"ok": False, "error": str(e) or type(e).__name__},
+            },
+        )
+    latency_ms = round((time.perf_counter() - start) * 1000, 3)
+    return {"status": "ready", "database": {"ok": True, "latency_ms": latency_ms}}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
+def _component_metrics():
+    yield from stats_metrics(
+        "password_hasher", "Password hasher", {"default": hasher.stats()}, "pool",
+        counters=("completed", "rejected"),
+    )
+    yield from stats_metrics(
+        "mongodb_pool", "MongoDB connection pool", {"default": pool_stats.stats()}, "pool",
+        counters=("checkouts", "checkout_failures"),
+    )
+    yield from stats_metrics(
+        "cache", "In-process cache", {name: cache.stats() for name, cache in caches.items()}, "cache",
+        counters=("hits", "misses", "evictions"),
+    )
+    yield from stats_metrics(
+        "maintenance_job", "Maintenance job", scheduler.stats(), "job",
+        counters=("runs", "failures", "skipped_not_leader", "total_removed"),
+    )
+    yield from stats_metrics(
+        "admission", "Admission control limiter", admission.stats(), "limiter",
+        counters=("rejected",),
+    )
+
+
+registry.add_collector(_component_metrics) 
\ No newline at end of file
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
+from app.models.user import UserResponse
 
 
 class AppUserBase(BaseModel):
@@ -34,4 +35,30 @@ class AppUserResponse(AppUserBase):
     model_config = {
         "populate_by_name": True,
         "json_encoders": {}
-    } 
\ No newline at end of file
+    } 
+
+
+class AppMemberResponse(UserResponse):
+    app_roles: List[str] = []
+
+
+class MembershipRoles(BaseModel):
+    user_id: str
+    roles: List[str] = ["viewer"]
+
+
+class BulkMembershipRequest(BaseModel):
+    add: List[MembershipRoles] = []
+    remove: List[str] = []
+    update: List[MembershipRoles] = []
+
+
+class BulkMembershipResult(BaseModel):
+    op: str  # add, remove or update
+    user_id: str
+    status: str  # added, removed, updated, already_member, not_member, user_not_found, conflict or error
+    error: Optional[str] = None
+
+
+class BulkMembershipResponse(BaseModel):
+    results: List[BulkMembershipResult]
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 
 
 class LoginRequest(BaseModel):
@@ -26,6 +26,22 @@ class TokenData(BaseModel):
     roles: Optional[list] = None
 
 
+class BatchVerifyRequest(BaseModel):
+    tokens: List[str]
+
+
+class TokenVerifyResult(BaseModel):
+    valid: bool
+    code: str
+    user_id: Optional[str] = None
+    email: Optional[str] = None
+    roles: Optional[list] = None
+
+
+class BatchVerifyResponse(BaseModel):
+    results: List[TokenVerifyResult]
+
+
 class UserInfo(BaseModel):
     id: str
     email: str
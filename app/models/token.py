@@ -1,4 +1,5 @@
 from pydantic import BaseModel, Field
+from typing import Optional
 from datetime import datetime
 
 
@@ -14,6 +15,8 @@ class TokenCreate(TokenBase):
 
 class TokenInDB(TokenBase):
     id: str = Field(alias="_id")
+    family_id: Optional[str] = None
+    used_at: Optional[datetime] = None
 
     model_config = {
         "populate_by_name": True,
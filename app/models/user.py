@@ -37,4 +37,22 @@ class UserResponse(UserBase):
     model_config = {
         "populate_by_name": True,
         "json_encoders": {}
-    } 
\ No newline at end of file
+    } 
+
+
+class BulkUserResult(BaseModel):
+    row: int
+    status: str  # created, duplicate, invalid or failed (not attempted; safe to retry)
+    id: Optional[str] = None
+    email: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkUserImportResponse(BaseModel):
+    created: int
+    duplicate: int
+    invalid: int
+    failed: int = 0
+    seconds: float
+    rows_per_sec: float
+    results: List[BulkUserResult]
\ No newline at end of file
@@ -0,0 +1 @@
+# Repositories package 
\ No newline at end of file
@@ -0,0 +1,58 @@
+from typing import Any, List, Optional, Tuple
+from app.database import get_database
+from app.models.app import AppInDB, AppResponse
+from app.utils.pagination import paginate
+
+# AppResponse fields (client_secret is the stored bcrypt hash)
+PUBLIC = {
+    "name": 1, "redirect_uris": 1, "description": 1, "logo_url": 1, "website_url": 1,
+    "client_id": 1, "client_secret": 1, "created_by": 1, "created_at": 1,
+}
+# Ownership checks only compare the creator
+OWNER = {"created_by": 1}
+
+
+class AppRepository:
+    """Queries on the apps collection, each fetching only the fields its use case needs"""
+
+    def __init__(self, secondary_ok: bool = False):
+        self.collection = get_database(secondary_ok=secondary_ok).apps
+
+    async def insert(self, app_dict: dict) -> None:
+        await self.collection.insert_one(app_dict)
+
+    async def find_public(self, app_id: str) -> Optional[AppResponse]:
+        app = await self.collection.find_one({"_id": app_id}, PUBLIC)
+        return AppResponse(**app) if app else None
+
+    async def find_public_many(self, app_ids: List[str]) -> List[AppResponse]:
+        cursor = self.collection.find({"_id": {"$in": app_ids}}, PUBLIC)
+        return [AppResponse(**app) async for app in cursor]
+
+    async def find_owner(self, app_id: str) -> Optional[str]:
+        """The creator's user ID, or None if the app does not exist"""
+        app = await self.collection.find_one({"_id": app_id}, OWNER)
+        return app["created_by"] if app else None
+
+    async def find_credentials(self, client_id: str) -> Optional[AppInDB]:
+        app = await self.collection.find_one({"client_id": client_id})
+        return AppInDB(**app) if app else None
+
+    async def page(
+        self,
+        query: dict,
+        limit: int,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        raw: bool = False,
+    ) -> Tuple[List[Any], Optional[str], Optional[int]]:
+        return await paginate(self.collection, query, AppResponse, limit, cursor, include_total, raw)
+
+    async def update(self, app_id: str, fields: dict) -> bool:
+        """Set `fields`; returns whether anything changed"""
+        result = await self.collection.update_one({"_id": app_id}, {"$set": fields})
+        return result.modified_count > 0
+
+    async def delete(self, app_id: str) -> bool:
+        result = await self.collection.delete_one({"_id": app_id})
+        return result.deleted_count > 0
\ No newline at end of file
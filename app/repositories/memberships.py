@@ -0,0 +1,73 @@
+from typing import Dict, List, Optional, Set
+from app.database import get_database
+from app.repositories import users
+
+# A user's memberships as app ID and roles. roles is an array, and Mongo cannot
+# cover array fields from a (multikey) index, so this fetches the small documents.
+APP_ROLES = {"_id": 0, "app_id": 1, "roles": 1}
+# Which of a set of users belong to an app, answered from the same index
+USER_IDS = {"_id": 0, "user_id": 1}
+
+
+class MembershipRepository:
+    """Queries on the app_users collection, each fetching only the fields its use case needs"""
+
+    def __init__(self, secondary_ok: bool = False):
+        self.collection = get_database(secondary_ok=secondary_ok).app_users
+
+    async def insert(self, app_user_dict: dict) -> None:
+        await self.collection.insert_one(app_user_dict)
+
+    async def roles_by_app(self, user_id: str) -> Dict[str, List[str]]:
+        """Map of app ID to the user's roles in that app"""
+        cursor = self.collection.find({"user_id": user_id}, APP_ROLES)
+        return {app_user["app_id"]: app_user.get("roles", []) async for app_user in cursor}
+
+    async def member_ids(self, app_id: str, user_ids: List[str]) -> Set[str]:
+        cursor = self.collection.find({"user_id": {"$in": user_ids}, "app_id": app_id}, USER_IDS)
+        return {member["user_id"] async for member in cursor}
+
+    async def members_page(self, app_id: str, limit: int, after_id: Optional[str] = None) -> List[dict]:
+        """Up to `limit` memberships of an app after `after_id`, in ID order, each with
+        its roles and the member's public user fields under "user"
+        """
+        match = {"app_id": app_id}
+        if after_id:
+            match["_id"] = {"$gt": after_id}
+        pipeline = [
+            {"$match": match},
+            {"$sort": {"_id": 1}},
+            {"$limit": limit},
+            {"$lookup": {"from": "users", "localField": "user_id", "foreignField": "_id", "as": "user",
+                         "pipeline": [{"$project": users.PUBLIC}]}},
+            {"$project": {"roles": 1, "user": {"$first": "$user"}}},
+        ]
+        return [row async for row in self.collection.aggregate(pipeline)]
+
+    async def delete(self, app_id: str, user_id: str) -> bool:
+        result = await self.collection.delete_one({"app_id": app_id, "user_id": user_id})
+        return result.deleted_count > 0
+
+    async def orphan_scan(self, after_id: Optional[str], limit: int) -> List[dict]:
+        """Up to `limit` memberships after `after_id` as {_id, user_id, orphaned}:
+        whether the app or the user is gone
+        """
+        match = {"_id": {"$gt": after_id}} if after_id else {}
+        pipeline = [
+            {"$match": match},
+            {"$sort": {"_id": 1}},
+            {"$limit": limit},
+            {"$lookup": {"from": "apps", "localField": "app_id", "foreignField": "_id", "as": "app",
+                         "pipeline": [{"$project": {"_id": 1}}]}},
+            {"$lookup": {"from": "users", "localField": "user_id", "foreignField": "_id", "as": "user",
+                         "pipeline": [{"$project": {"_id": 1}}]}},
+            {"$project": {"user_id": 1, "orphaned": {"$or": [{"$eq": ["$app", []]}, {"$eq": ["$user", []]}]}}},
+        ]
+        return [doc async for doc in self.collection.aggregate(pipeline)]
+
+    async def delete_ids(self, membership_ids: List[str]) -> int:
+        result = await self.collection.delete_many({"_id": {"$in": membership_ids}})
+        return result.deleted_count
+
+    async def bulk_write(self, operations: list) -> None:
+        await self.collection.bulk_write(operations, ordered=False)
\ No newline at end of file
@@ -0,0 +1,65 @@
+from typing import Any, List, Optional, Set, Tuple
+from app.database import get_database
+from app.models.user import UserInDB, UserResponse
+from app.utils.pagination import paginate
+
+# UserResponse fields; never the password hash
+PUBLIC = {"email": 1, "name": 1, "roles": 1, "created_at": 1}
+# What a login needs to check a password and issue tokens
+CREDENTIALS = {"email": 1, "name": 1, "roles": 1, "password_hash": 1, "created_at": 1}
+# Existence checks, answered from the _id index alone
+ID_ONLY = {"_id": 1}
+# Which emails are taken, answered from the unique email index alone
+EMAIL_ONLY = {"_id": 0, "email": 1}
+
+
+class UserRepository:
+    """Queries on the users collection, each fetching only the fields its use case needs"""
+
+    def __init__(self, secondary_ok: bool = False):
+        self.collection = get_database(secondary_ok=secondary_ok).users
+
+    async def insert(self, user_dict: dict) -> None:
+        await self.collection.insert_one(user_dict)
+
+    async def find_public(self, user_id: str) -> Optional[UserResponse]:
+        user = await self.collection.find_one({"_id": user_id}, PUBLIC)
+        return UserResponse(**user) if user else None
+
+    async def find_credentials(self, email: str) -> Optional[UserInDB]:
+        user = await self.collection.find_one({"email": email}, CREDENTIALS)
+        return UserInDB(**user) if user else None
+
+    async def existing_emails(self, emails: List[str]) -> Set[str]:
+        cursor = self.collection.find({"email": {"$in": emails}}, EMAIL_ONLY)
+        return {user["email"] async for user in cursor}
+
+    async def existing_ids(self, user_ids: List[str]) -> Set[str]:
+        cursor = self.collection.find({"_id": {"$in": user_ids}}, ID_ONLY)
+        return {user["_id"] async for user in cursor}
+
+    async def page(
+        self,
+        query: dict,
+        limit: int,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        raw: bool = False,
+    ) -> Tuple[List[Any], Optional[str], Optional[int]]:
+        return await paginate(self.collection, query, UserResponse, limit, cursor, include_total, raw)
+
+    async def update(self, user_id: str, fields: dict) -> bool:
+        """Set `fields`; returns whether anything changed"""
+        result = await self.collection.update_one({"_id": user_id}, {"$set": fields})
+        return result.modified_count > 0
+
+    async def replace_password_hash(self, user_id: str, old_hash: str, new_hash: str) -> None:
+        # Only replace the hash we verified against; a concurrent password change wins
+        await self.collection.update_one(
+            {"_id": user_id, "password_hash": old_hash},
+            {"$set": {"password_hash": new_hash}}
+        )
+
+    async def delete(self, user_id: str) -> bool:
+        result = await self.collection.delete_one({"_id": user_id})
+        return result.deleted_count > 0
\ No newline at end of file
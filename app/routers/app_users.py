@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from typing import List, Optional
 from pydantic import BaseModel
-from app.models.app_user import AppUserCreate
-from app.models.user import UserResponse
+from app.config import settings
+from app.models.app_user import AppUserCreate, AppMemberResponse, BulkMembershipRequest, BulkMembershipResponse
 from app.services.app_user_service import AppUserService
 from app.services.app_service import AppService
 from app.dependencies import get_current_user
 from app.models.auth import TokenData
+from app.utils.pagination import encode_cursor, decode_cursor, set_pagination_headers
 
 
 class AddUserToAppRequest(BaseModel):
@@ -27,15 +28,15 @@ async def add_user_to_app(
     app_service = AppService()
     
     # Check if app exists
-    app = await app_service.get_app_by_id(app_id)
-    if not app:
+    owner = await app_service.get_app_owner(app_id)
+    if not owner:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="App not found"
         )
     
     # Check if user is admin or app creator
-    if "admin" not in current_user.roles and app.created_by != current_user.user_id:
+    if "admin" not in current_user.roles and owner != current_user.user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to manage users for this app"
@@ -60,31 +61,84 @@ async def add_user_to_app(
         )
 
 
-@router.get("/{app_id}/users", response_model=List[UserResponse])
-async def get_app_users(app_id: str, current_user: TokenData = Depends(get_current_user)):
-    """List app users"""
+@router.get("/{app_id}/users", response_model=List[AppMemberResponse])
+async def get_app_users(
+    app_id: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    cursor: Optional[str] = None,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """List app users with their app roles, a page at a time"""
     app_user_service = AppUserService()
     app_service = AppService()
     
     # Check if app exists
-    app = await app_service.get_app_by_id(app_id)
-    if not app:
+    owner = await app_service.get_app_owner(app_id)
+    if not owner:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="App not found"
         )
     
     # Check if user is admin, app creator, or app member
-    if "admin" not in current_user.roles and app.created_by != current_user.user_id:
+    if "admin" not in current_user.roles and owner != current_user.user_id:
         # Check if user is a member of the app
-        user_apps = await app_user_service.get_user_apps(current_user.user_id)
-        if app_id not in user_apps:
+        if not await app_user_service.is_member(app_id, current_user.user_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to view users for this app"
             )
     
-    return await app_user_service.get_app_users(app_id)
+    after_id = None
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 1 or not isinstance(values[0], str):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        after_id = values[0]
+    members, last_id = await app_user_service.get_app_users(app_id, limit, after_id)
+    set_pagination_headers(response, request, encode_cursor([last_id]) if last_id else None)
+    return members
+
+
+@router.post("/{app_id}/users/bulk", response_model=BulkMembershipResponse)
+async def bulk_update_app_users(
+    app_id: str,
+    changes: BulkMembershipRequest,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Add, remove and change roles of many app users in one call"""
+    app_user_service = AppUserService()
+    app_service = AppService()
+    
+    total_ops = len(changes.add) + len(changes.remove) + len(changes.update)
+    if total_ops > settings.bulk_membership_max_ops:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.bulk_membership_max_ops} operations per request"
+        )
+    
+    # Check if app exists
+    owner = await app_service.get_app_owner(app_id)
+    if not owner:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="App not found"
+        )
+    
+    # Check if user is admin or app creator
+    if "admin" not in current_user.roles and owner != current_user.user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to manage users for this app"
+        )
+    
+    results = await app_user_service.apply_bulk_changes(app_id, changes)
+    return BulkMembershipResponse(results=results)
 
 
 @router.delete("/{app_id}/users/{user_id}")
@@ -98,15 +152,15 @@ async def remove_user_from_app(
     app_service = AppService()
     
     # Check if app exists
-    app = await app_service.get_app_by_id(app_id)
-    if not app:
+    owner = await app_service.get_app_owner(app_id)
+    if not owner:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="App not found"
         )
     
     # Check if user is admin or app creator
-    if "admin" not in current_user.roles and app.created_by != current_user.user_id:
+    if "admin" not in current_user.roles and owner != current_user.user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to remove users from this app"
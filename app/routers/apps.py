@@ -1,18 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from typing import List, Optional
+from datetime import datetime
+from app.config import settings
 from app.models.app import AppCreate, AppUpdate, AppResponse
 from app.services.app_service import AppService
 from app.dependencies import get_current_user
 from app.models.auth import TokenData
+from app.utils.pagination import set_pagination_headers
+from app.utils.serialization import rows_response
 
 router = APIRouter(prefix="/apps", tags=["Apps"])
 
 
 @router.get("/", response_model=List[AppResponse])
-async def get_apps(current_user: TokenData = Depends(get_current_user)):
-    """List all apps"""
+async def get_apps(
+    request: Request,
+    response: Response,
+    limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    cursor: Optional[str] = None,
+    created_by: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    include_total: bool = False,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """List apps a page at a time, oldest first"""
     app_service = AppService()
-    return await app_service.get_all_apps()
+    apps, next_cursor, total = await app_service.get_all_apps(
+        limit, cursor, created_by=created_by, created_after=created_after, include_total=include_total,
+        raw=settings.fast_serialization
+    )
+    if settings.fast_serialization:
+        # Rows are already in AppResponse's shape; skip response_model re-validation
+        response = rows_response(apps)
+    set_pagination_headers(response, request, next_cursor, total)
+    return response if settings.fast_serialization else apps
 
 
 @router.post("/", response_model=AppResponse)
@@ -45,14 +66,14 @@ async def update_app(
     app_service = AppService()
     
     # Check if user is admin or app creator
-    app = await app_service.get_app_by_id(app_id)
-    if not app:
+    owner = await app_service.get_app_owner(app_id)
+    if not owner:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="App not found"
         )
     
-    if "admin" not in current_user.roles and app.created_by != current_user.user_id:
+    if "admin" not in current_user.roles and owner != current_user.user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this app"
@@ -73,14 +94,14 @@ async def delete_app(app_id: str, current_user: TokenData = Depends(get_current_
     app_service = AppService()
     
     # Check if user is admin or app creator
-    app = await app_service.get_app_by_id(app_id)
-    if not app:
+    owner = await app_service.get_app_owner(app_id)
+    if not owner:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="App not found"
         )
     
-    if "admin" not in current_user.roles and app.created_by != current_user.user_id:
+    if "admin" not in current_user.roles and owner != current_user.user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete this app"
@@ -1,17 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from app.models.auth import LoginRequest, RegisterRequest, TokenResponse, UserInfo
 from app.services.user_service import UserService
 from app.services.token_service import TokenService
 from app.utils.auth import create_access_token, create_refresh_token
+from app.utils.rate_limit import admission
 from app.dependencies import get_current_user
 from app.models.auth import TokenData
+from app.models.user import UserCreate
 from datetime import timedelta
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(login_data: LoginRequest):
+async def login(login_data: LoginRequest, request: Request):
+    # Turn floods away before any database or bcrypt work
+    admission.admit("login", request, login_data.email)
+    
     user_service = UserService()
     token_service = TokenService()
     
@@ -41,17 +46,19 @@ async def login(login_data: LoginRequest):
 
 
 @router.post("/register", response_model=TokenResponse)
-async def register(register_data: RegisterRequest):
+async def register(register_data: RegisterRequest, request: Request):
+    admission.admit("register", request, register_data.email)
+    
     user_service = UserService()
     token_service = TokenService()
     
     # Create user
-    user_data = {
-        "email": register_data.email,
-        "password": register_data.password,
-        "name": register_data.name,
-        "roles": ["user"]
-    }
+    user_data = UserCreate(
+        email=register_data.email,
+        password=register_data.password,
+        name=register_data.name,
+        roles=["user"]
+    )
     user = await user_service.create_user(user_data)
     
     # Create tokens
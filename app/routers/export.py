@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from datetime import datetime
+from app.services.export_service import ExportService
+from app.dependencies import require_admin
+from app.models.auth import TokenData
+from app.utils.pagination import decode_keyset_cursor
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+@router.get("/{dataset}")
+async def export_dataset(
+    dataset: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    fields: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    checkpoint: Optional[str] = None,
+    include_checkpoints: bool = False,
+    batch_size: int = Query(1000, ge=1, le=10000),
+    current_user: TokenData = Depends(require_admin)
+):
+    """Stream users, apps or memberships as NDJSON or CSV (admin only)"""
+    export_service = ExportService(dataset)
+    selected_fields = export_service.resolve_fields(fields.split(",") if fields else None)
+    # Once streaming starts the 200 is sent, so a bad checkpoint must fail here
+    if checkpoint:
+        decode_keyset_cursor(checkpoint)
+    
+    return StreamingResponse(
+        export_service.stream(
+            format,
+            selected_fields,
+            include_checkpoints=include_checkpoints,
+            created_after=created_after,
+            created_before=created_before,
+            checkpoint=checkpoint,
+            batch_size=batch_size,
+        ),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{format}"'},
+    )
\ No newline at end of file
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.config import settings
+from app.utils.keys import key_ring
+
+router = APIRouter(tags=["Token Management"])
+
+
+@router.get("/.well-known/jwks.json")
+async def get_jwks():
+    """Public keys for verifying access tokens locally"""
+    return JSONResponse(
+        content=key_ring.jwks(),
+        headers={"Cache-Control": f"public, max-age={settings.jwks_cache_max_age}"},
+    )
\ No newline at end of file
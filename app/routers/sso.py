@@ -11,6 +11,7 @@ from app.models.auth import TokenData
 from app.utils.auth import create_access_token
 from datetime import timedelta
 from app.config import settings
+from app.utils.serialization import models_response
 
 router = APIRouter(prefix="/sso", tags=["SSO"])
 
@@ -24,13 +25,10 @@ async def get_user_dashboard(current_user: TokenData = Depends(get_current_user)
     # Get all app IDs that the user belongs to
     user_app_ids = await app_user_service.get_user_apps(current_user.user_id)
     
-    # Get app details for each app
-    user_apps = []
-    for app_id in user_app_ids:
-        app = await app_service.get_app_by_id(app_id)
-        if app:
-            user_apps.append(app)
-    
+    # Get app details for all of them at once
+    user_apps = await app_service.get_apps_by_ids(user_app_ids)
+    if settings.fast_serialization:
+        return models_response(user_apps, AppResponse)
     return user_apps
 
 
@@ -53,8 +51,7 @@ async def launch_app(
         )
     
     # Check if user has access to this app
-    user_apps = await app_user_service.get_user_apps(current_user.user_id)
-    if app_id not in user_apps:
+    if not await app_user_service.is_member(app_id, current_user.user_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied to this app"
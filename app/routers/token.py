@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from app.models.auth import TokenResponse, TokenData
+from app.models.auth import TokenResponse, TokenData, BatchVerifyRequest, BatchVerifyResponse, TokenVerifyResult
 from app.services.token_service import TokenService
 from app.services.user_service import UserService
-from app.utils.auth import create_access_token, verify_token, create_refresh_token
+from app.utils.auth import create_access_token, verify_token, create_refresh_token, inspect_token, TOKEN_VALID
 from app.dependencies import get_current_user
-from datetime import timedelta
+from app.config import settings
+from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/token", tags=["Token Management"])
 
@@ -34,6 +35,35 @@ async def verify_token_endpoint(token_data: dict):
     }
 
 
+@router.post("/verify/batch", response_model=BatchVerifyResponse)
+async def verify_token_batch(batch: BatchVerifyRequest):
+    """Verify many tokens in one call; results are returned in input order"""
+    if len(batch.tokens) > settings.token_verify_batch_max:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.token_verify_batch_max} tokens per batch"
+        )
+    
+    # Repeated tokens are only verified once
+    results = {}
+    for token in batch.tokens:
+        if token in results:
+            continue
+        code, verified_data = inspect_token(token)
+        if code == TOKEN_VALID:
+            results[token] = TokenVerifyResult(
+                valid=True,
+                code=code,
+                user_id=verified_data.user_id,
+                email=verified_data.email,
+                roles=verified_data.roles
+            )
+        else:
+            results[token] = TokenVerifyResult(valid=False, code=code)
+    
+    return BatchVerifyResponse(results=[results[token] for token in batch.tokens])
+
+
 @router.post("/refresh", response_model=TokenResponse)
 async def refresh_token(refresh_data: dict):
     """Refresh expired access token"""
@@ -47,8 +77,13 @@ async def refresh_token(refresh_data: dict):
     token_service = TokenService()
     user_service = UserService()
     
-    # Verify refresh token exists and is not expired
-    token_doc = await token_service.get_refresh_token(refresh_token_value)
+    # Consume the refresh token; it can only be exchanged once
+    token_doc, reused = await token_service.consume_refresh_token(refresh_token_value)
+    if reused:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token reuse detected, session revoked"
+        )
     if not token_doc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -56,10 +91,7 @@ async def refresh_token(refresh_data: dict):
         )
     
     # Check if token is expired
-    from datetime import datetime
     if token_doc.expires_at < datetime.utcnow():
-        # Clean up expired token
-        await token_service.delete_refresh_token(refresh_token_value)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Refresh token expired"
@@ -78,15 +110,15 @@ async def refresh_token(refresh_data: dict):
         data={"sub": str(user.id), "email": user.email, "roles": user.roles}
     )
     
-    # Create new refresh token
+    # Issue the successor in the same family; the old token stays behind, marked
+    # used, so a replay can be detected until it expires
     new_refresh_token = create_refresh_token()
-    
-    # Store new refresh token and delete old one
-    await token_service.create_refresh_token(str(user.id), new_refresh_token)
-    await token_service.delete_refresh_token(refresh_token_value)
+    await token_service.create_refresh_token(
+        str(user.id), new_refresh_token, family_id=token_doc.family_id or token_doc.id
+    )
     
     return TokenResponse(
         access_token=access_token,
         refresh_token=new_refresh_token,
         expires_in=30 * 60  # 30 minutes
-    ) 
\ No newline at end of file
+    )
\ No newline at end of file
@@ -1,18 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from app.models.user import UserCreate, UserUpdate, UserResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from typing import List, Optional
+from datetime import datetime
+from app.config import settings
+from app.models.user import UserCreate, UserUpdate, UserResponse, BulkUserImportResponse
 from app.services.user_service import UserService
+from app.services.user_import_service import UserImportService, parse_user_rows
 from app.dependencies import require_admin, get_current_user
 from app.models.auth import TokenData
+from app.utils.pagination import set_pagination_headers
+from app.utils.serialization import rows_response
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.get("/", response_model=List[UserResponse])
-async def get_users(current_user: TokenData = Depends(require_admin)):
-    """List all users (admin only)"""
+async def get_users(
+    request: Request,
+    response: Response,
+    limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    cursor: Optional[str] = None,
+    role: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    include_total: bool = False,
+    current_user: TokenData = Depends(require_admin)
+):
+    """List users a page at a time, oldest first (admin only)"""
     user_service = UserService()
-    return await user_service.get_all_users()
+    users, next_cursor, total = await user_service.get_all_users(
+        limit, cursor, role=role, created_after=created_after, include_total=include_total,
+        raw=settings.fast_serialization
+    )
+    if settings.fast_serialization:
+        # Rows are already in UserResponse's shape; skip response_model re-validation
+        response = rows_response(users)
+    set_pagination_headers(response, request, next_cursor, total)
+    return response if settings.fast_serialization else users
 
 
 @router.post("/", response_model=UserResponse)
@@ -22,6 +44,36 @@ async def create_user(user_data: UserCreate, current_user: TokenData = Depends(r
     return await user_service.create_user(user_data)
 
 
+async def _read_import_body(request: Request) -> bytes:
+    """Read an upload, giving up as soon as it is known to exceed the size cap"""
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Uploads are limited to {settings.bulk_import_max_bytes} bytes"
+    )
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.bulk_import_max_bytes:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > settings.bulk_import_max_bytes:
+            raise too_large
+    return bytes(body)
+
+
+@router.post("/bulk", response_model=BulkUserImportResponse)
+async def import_users(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$"),
+    current_user: TokenData = Depends(require_admin)
+):
+    """Import users from an NDJSON or CSV body (admin only)"""
+    import_format = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    rows = parse_user_rows(await _read_import_body(request), import_format)
+    user_import_service = UserImportService()
+    return await user_import_service.import_users(rows)
+
+
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(user_id: str, current_user: TokenData = Depends(get_current_user)):
     """Get user by ID (admin or self)"""
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.config import settings
+from app.database import get_database
+from app.services.app_user_service import AppUserService
+from app.services.token_service import TokenService
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """A periodic maintenance task; `func` returns the number of documents it removed"""
+
+    def __init__(self, name: str, interval: float, func: Callable[[], Awaitable[int]]):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_duration_ms: Optional[float] = None
+        self.last_removed = 0
+        self.total_removed = 0
+        self.last_success: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    def stats(self) -> dict:
+        return {
+            "interval_seconds": self.interval,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped_not_leader": self.skipped,
+            "last_duration_ms": self.last_duration_ms,
+            "last_removed": self.last_removed,
+            "total_removed": self.total_removed,
+            "last_success": self.last_success.isoformat() if self.last_success else None,
+            "last_error": self.last_error,
+        }
+
+
+class Scheduler:
+    """Runs maintenance jobs in the background of every replica.
+
+    Each tick, a replica first takes a per-job lease in the `scheduler_locks`
+    collection; only the lease holder runs the job, and it keeps renewing the
+    lease for as long as it stays alive. Ticks are jittered so replicas don't
+    wake up in lockstep.
+    """
+
+    def __init__(self):
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.jobs: Dict[str, Job] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def add_job(self, name: str, interval: float, func: Callable[[], Awaitable[int]]) -> None:
+        self.jobs[name] = Job(name, interval, func)
+
+    def start(self) -> None:
+        for job in self.jobs.values():
+            self._tasks.append(asyncio.create_task(self._loop(job)))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _loop(self, job: Job) -> None:
+        while True:
+            jitter = random.uniform(-settings.maintenance_jitter, settings.maintenance_jitter)
+            await asyncio.sleep(job.interval * (1 + jitter))
+            try:
+                if not await self._acquire_lease(job):
+                    job.skipped += 1
+                    continue
+            except Exception:
+                logger.exception("Could not take the lease for job %s", job.name)
+                continue
+            await self.run_job(job)
+
+    async def _acquire_lease(self, job: Job) -> bool:
+        now = datetime.utcnow()
+        locks = get_database().scheduler_locks
+        try:
+            lock = await locks.find_one_and_update(
+                {"_id": job.name, "$or": [{"locked_until": {"$lt": now}}, {"owner": self.owner}]},
+                {"$set": {"owner": self.owner, "locked_until": now + timedelta(seconds=job.interval * 2)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # Another replica holds an unexpired lease
+            return False
+        return lock is not None and lock["owner"] == self.owner
+
+    async def run_job(self, job: Job) -> None:
+        start = time.perf_counter()
+        job.runs += 1
+        try:
+            job.last_removed = await job.func()
+            job.total_removed += job.last_removed
+            job.last_success = datetime.utcnow()
+            job.last_error = None
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            logger.exception("Maintenance job %s failed", job.name)
+        finally:
+            job.last_duration_ms = round((time.perf_counter() - start) * 1000, 3)
+
+    def stats(self) -> dict:
+        return {name: job.stats() for name, job in self.jobs.items()}
+
+
+async def sweep_expired_tokens() -> int:
+    return await TokenService().cleanup_expired_tokens(limit=settings.maintenance_batch_size)
+
+
+class _MembershipCompaction:
+    """Walks app_users a batch per tick, resuming where the last tick stopped"""
+
+    def __init__(self):
+        self.after_id: Optional[str] = None
+
+    async def __call__(self) -> int:
+        removed, self.after_id = await AppUserService().purge_orphaned_memberships(
+            self.after_id, settings.maintenance_batch_size
+        )
+        return removed
+
+
+scheduler = Scheduler()
+scheduler.add_job("token_sweep", settings.token_sweep_interval_seconds, sweep_expired_tokens)
+scheduler.add_job("membership_compaction", settings.membership_compaction_interval_seconds, _MembershipCompaction())
\ No newline at end of file
@@ -1,21 +1,32 @@
-from typing import List, Optional
-from app.database import get_database
+from typing import List, Optional, Tuple
+from app.config import settings
 from app.models.app import AppCreate, AppUpdate, AppInDB, AppResponse
-from app.utils.auth import generate_client_id, generate_client_secret, get_password_hash
+from app.utils.auth import generate_client_id, generate_client_secret
+from app.utils.hashing import hash_password, verify_password
+from app.repositories.apps import AppRepository
+from app.utils.rate_limit import admission
+from app.services.app_user_service import membership_cache
+from app.utils.cache import TTLCache, NOT_FOUND
 from fastapi import HTTPException, status
+from pymongo.errors import PyMongoError
 from datetime import datetime
 import uuid
 
+# app_id -> AppResponse as stored (client_secret is the bcrypt hash), or NOT_FOUND.
+# The plaintext secret returned by create_app is never put here.
+app_cache = TTLCache("apps", settings.entity_cache_size, settings.entity_cache_ttl_seconds)
+
 class AppService:
     def __init__(self):
-        self.db = get_database()
-        self.collection = self.db.apps
+        self.repository = AppRepository()
+        # Listings and dashboards may lag the primary; credential checks may not
+        self.listing_repository = AppRepository(secondary_ok=True)
 
     async def create_app(self, app_data: AppCreate, created_by: str) -> AppResponse:
         # Generate client credentials
         client_id = generate_client_id()
         client_secret = generate_client_secret()
-        client_secret_hash = get_password_hash(client_secret)
+        client_secret_hash = await hash_password(client_secret)
         
         # Create app document with string ID
         app_dict = app_data.dict()
@@ -25,31 +36,87 @@ class AppService:
         app_dict["created_by"] = created_by
         app_dict["created_at"] = datetime.utcnow()
         
-        result = await self.collection.insert_one(app_dict)
-        
-        # Get created app
-        created_app = await self.collection.find_one({"_id": app_dict["_id"]})
-        app_response = AppResponse(**created_app)
+        await self.repository.insert(app_dict)
         
         # Return with plain client_secret for initial creation
-        app_response.client_secret = client_secret
-        return app_response
+        return AppResponse(**{**app_dict, "client_secret": client_secret})
 
     async def get_app_by_id(self, app_id: str) -> Optional[AppResponse]:
-        try:
-            app = await self.collection.find_one({"_id": app_id})
-            if app:
-                return AppResponse(**app)
+        cached = app_cache.get(app_id)
+        if cached is NOT_FOUND:
             return None
+        if cached is not None:
+            # Callers may mutate what they get back
+            return cached.model_copy(deep=True)
+        try:
+            app_response = await self.repository.find_public(app_id)
         except Exception:
             return None
+        if not app_response:
+            app_cache.set(app_id, NOT_FOUND, settings.entity_cache_negative_ttl_seconds)
+            return None
+        app_cache.set(app_id, app_response)
+        return app_response.model_copy(deep=True)
+
+    async def get_app_owner(self, app_id: str) -> Optional[str]:
+        """ID of the user who created the app, or None if it does not exist.
+
+        Ownership checks need nothing else, so a cache miss fetches just created_by.
+        A database failure is a 503, never mistaken for a missing app.
+        """
+        cached = app_cache.get(app_id)
+        if cached is NOT_FOUND:
+            return None
+        if cached is not None:
+            return cached.created_by
+        try:
+            owner = await self.repository.find_owner(app_id)
+        except PyMongoError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database unavailable, try again later"
+            )
+        if owner is None:
+            app_cache.set(app_id, NOT_FOUND, settings.entity_cache_negative_ttl_seconds)
+        return owner
+
+    async def get_apps_by_ids(self, app_ids: List[str]) -> List[AppResponse]:
+        """Apps for a list of IDs, in the same order; unknown IDs are left out.
 
-    async def get_all_apps(self) -> List[AppResponse]:
-        apps = []
-        cursor = self.collection.find({})
-        async for app in cursor:
-            apps.append(AppResponse(**app))
-        return apps
+        Cache misses are fetched together in a single secondary-eligible query.
+        What a secondary returns may lag the primary, so it is not cached:
+        get_app_by_id and the ownership checks read the same cache.
+        """
+        apps = {}
+        missing = []
+        for app_id in app_ids:
+            cached = app_cache.get(app_id)
+            if cached is NOT_FOUND:
+                continue
+            if cached is None:
+                missing.append(app_id)
+            else:
+                apps[app_id] = cached.model_copy(deep=True)
+        if missing:
+            for app_response in await self.listing_repository.find_public_many(missing):
+                apps[app_response.id] = app_response
+        return [apps[app_id] for app_id in app_ids if app_id in apps]
+
+    async def get_all_apps(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        created_by: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        include_total: bool = False,
+        raw: bool = False,
+    ) -> Tuple[List[AppResponse], Optional[str], Optional[int]]:
+        query = {}
+        if created_by:
+            query["created_by"] = created_by
+        if created_after:
+            query["created_at"] = {"$gt": created_after}
+        return await self.listing_repository.page(query, limit, cursor, include_total, raw)
 
     async def update_app(self, app_id: str, app_data: AppUpdate) -> Optional[AppResponse]:
         try:
@@ -57,12 +124,10 @@ class AppService:
             if not update_data:
                 return await self.get_app_by_id(app_id)
             
-            result = await self.collection.update_one(
-                {"_id": app_id},
-                {"$set": update_data}
-            )
+            modified = await self.repository.update(app_id, update_data)
+            app_cache.delete(app_id)
             
-            if result.modified_count:
+            if modified:
                 return await self.get_app_by_id(app_id)
             return None
         except Exception:
@@ -70,20 +135,23 @@ class AppService:
 
     async def delete_app(self, app_id: str) -> bool:
         try:
-            result = await self.collection.delete_one({"_id": app_id})
-            return result.deleted_count > 0
+            deleted = await self.repository.delete(app_id)
+            app_cache.delete(app_id)
+            # Members of the app are not tracked per app; app deletion is rare
+            membership_cache.clear()
+            return deleted
         except Exception:
             return False
 
     async def verify_client_credentials(self, client_id: str, client_secret: str) -> Optional[AppInDB]:
-        app = await self.collection.find_one({"client_id": client_id})
-        if not app:
+        admission.admit_client(client_id)
+        
+        app_in_db = await self.repository.find_credentials(client_id)
+        if not app_in_db:
             return None
         
-        app_in_db = AppInDB(**app)
         # Verify client secret hash
-        from app.utils.auth import verify_password
-        if not verify_password(client_secret, app_in_db.client_secret):
+        if not await verify_password(client_secret, app_in_db.client_secret):
             return None
         
         return app_in_db 
\ No newline at end of file
@@ -1,97 +1,191 @@
-from typing import List, Optional
-from app.database import get_database
-from app.models.app_user import AppUserCreate, AppUserUpdate, AppUserInDB, AppUserResponse
-from app.models.user import UserResponse
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+from app.models.app_user import (
+    AppUserCreate, AppUserUpdate, AppUserInDB, AppUserResponse, AppMemberResponse,
+    BulkMembershipRequest, BulkMembershipResult,
+)
 from fastapi import HTTPException, status
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from app.repositories.memberships import MembershipRepository
+from app.repositories.users import UserRepository
+from app.utils.cache import TTLCache
 from datetime import datetime
 import uuid
 
+# user_id -> {app_id: app roles}. Invalidated on every membership write made by
+# this process; other replicas see changes once the TTL runs out.
+membership_cache = TTLCache("memberships", settings.membership_cache_size, settings.membership_cache_ttl_seconds)
+
 
 class AppUserService:
     def __init__(self):
-        self.db = get_database()
-        self.collection = self.db.app_users
+        self.repository = MembershipRepository()
+        # Member listings may lag the primary; membership checks may not
+        self.listing_repository = MembershipRepository(secondary_ok=True)
 
     async def add_user_to_app(self, app_user_data: AppUserCreate) -> AppUserResponse:
-        # Check if user is already in the app
-        existing = await self.collection.find_one({
-            "user_id": app_user_data.user_id,
-            "app_id": app_user_data.app_id
-        })
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="User is already in this app"
-            )
-        
         # Create app_user document with string ID
         app_user_dict = app_user_data.dict()
         app_user_dict["_id"] = str(uuid.uuid4())
         app_user_dict["created_at"] = datetime.utcnow()
         
-        result = await self.collection.insert_one(app_user_dict)
+        # The unique (user_id, app_id) index rejects duplicate memberships
+        try:
+            await self.repository.insert(app_user_dict)
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="User is already in this app"
+            )
+        finally:
+            membership_cache.delete(app_user_data.user_id)
         
-        # Get created app_user
-        created_app_user = await self.collection.find_one({"_id": app_user_dict["_id"]})
-        return AppUserResponse(**created_app_user)
+        return AppUserResponse(**app_user_dict)
 
-    async def get_app_users(self, app_id: str) -> List[UserResponse]:
-        try:
-            # Get all app_user relationships for this app
-            app_users = []
-            cursor = self.collection.find({"app_id": app_id})
-            async for app_user in cursor:
-                app_users.append(AppUserResponse(**app_user))
-            
-            # Get user details for each app_user
-            users = []
-            for app_user in app_users:
-                user = await self.db.users.find_one({"_id": app_user.user_id})
-                if user:
-                    users.append(UserResponse(**user))
-            
-            return users
-        except Exception:
-            return []
+    async def get_app_users(
+        self, app_id: str, limit: int, after_id: Optional[str] = None
+    ) -> Tuple[List[AppMemberResponse], Optional[str]]:
+        """One page of an app's members with their app roles, in membership ID order.
+
+        Users are joined in the same aggregation. Returns the page and the
+        membership ID to continue after, or None on the last page.
+        """
+        members = []
+        scanned = 0
+        last_id = None
+        has_more = False
+        # One extra row tells us whether another page follows
+        for row in await self.listing_repository.members_page(app_id, limit + 1, after_id):
+            if scanned == limit:
+                has_more = True
+                break
+            scanned += 1
+            last_id = row["_id"]
+            # Memberships whose user was deleted are skipped
+            if row.get("user"):
+                members.append(AppMemberResponse(**row["user"], app_roles=row.get("roles", [])))
+        return members, last_id if has_more else None
 
     async def remove_user_from_app(self, app_id: str, user_id: str) -> bool:
         try:
-            result = await self.collection.delete_one({
-                "app_id": app_id,
-                "user_id": user_id
-            })
-            return result.deleted_count > 0
+            removed = await self.repository.delete(app_id, user_id)
+            membership_cache.delete(user_id)
+            return removed
         except Exception:
             return False
 
-    async def update_user_roles(self, app_id: str, user_id: str, roles: List[str]) -> Optional[AppUserResponse]:
-        try:
-            result = await self.collection.update_one(
-                {
-                    "app_id": app_id,
-                    "user_id": user_id
-                },
-                {"$set": {"roles": roles}}
-            )
-            
-            if result.modified_count:
-                updated_app_user = await self.collection.find_one({
-                    "app_id": app_id,
-                    "user_id": user_id
-                })
-                if updated_app_user:
-                    return AppUserResponse(**updated_app_user)
-            return None
-        except Exception:
-            return None
+    async def get_user_memberships(self, user_id: str) -> Dict[str, List[str]]:
+        """Map of app ID to the user's app roles, served from the membership cache"""
+        memberships = membership_cache.get(user_id)
+        if memberships is None:
+            memberships = await self.repository.roles_by_app(user_id)
+            membership_cache.set(user_id, memberships)
+        return memberships
 
     async def get_user_apps(self, user_id: str) -> List[str]:
         """Get all app IDs that a user belongs to"""
         try:
-            app_ids = []
-            cursor = self.collection.find({"user_id": user_id})
-            async for app_user in cursor:
-                app_ids.append(app_user["app_id"])
-            return app_ids
+            return list(await self.get_user_memberships(user_id))
+        except Exception:
+            return []
+
+    async def is_member(self, app_id: str, user_id: str) -> bool:
+        """Check if a user belongs to an app"""
+        try:
+            return app_id in await self.get_user_memberships(user_id)
         except Exception:
-            return [] 
\ No newline at end of file
+            return False 
+
+    async def purge_orphaned_memberships(self, after_id: Optional[str], limit: int) -> Tuple[int, Optional[str]]:
+        """Scan up to `limit` memberships after `after_id` and delete those whose
+        app or user no longer exists.
+
+        Returns the number removed and the last scanned ID, or None once the
+        end of the collection is reached so the next pass starts over.
+        """
+        scanned = await self.repository.orphan_scan(after_id, limit)
+        orphaned = [doc for doc in scanned if doc["orphaned"]]
+        removed = 0
+        if orphaned:
+            try:
+                removed = await self.repository.delete_ids([doc["_id"] for doc in orphaned])
+            finally:
+                for doc in orphaned:
+                    membership_cache.delete(doc["user_id"])
+        last_id = scanned[-1]["_id"] if scanned else None
+        return removed, last_id if len(scanned) == limit else None
+
+    async def apply_bulk_changes(self, app_id: str, changes: BulkMembershipRequest) -> List[BulkMembershipResult]:
+        """Add, remove and re-role many members of one app in a single bulk_write.
+
+        Users and current memberships are each looked up with one query up
+        front so every item gets its own outcome. A user may only appear in
+        one operation per request; repeats are reported as conflicts.
+        """
+        requested = [("add", item.user_id, item.roles) for item in changes.add]
+        requested += [("remove", user_id, None) for user_id in changes.remove]
+        requested += [("update", item.user_id, item.roles) for item in changes.update]
+
+        all_user_ids = list({user_id for _, user_id, _ in requested})
+        added_user_ids = list({user_id for op, user_id, _ in requested if op == "add"})
+        existing_users = set()
+        if added_user_ids:
+            existing_users = await UserRepository().existing_ids(added_user_ids)
+        members = await self.repository.member_ids(app_id, all_user_ids)
+
+        now = datetime.utcnow()
+        results = []
+        operations = []
+        op_results = []
+        seen = set()
+        for op, user_id, roles in requested:
+            result = BulkMembershipResult(op=op, user_id=user_id, status="")
+            results.append(result)
+            if user_id in seen:
+                result.status = "conflict"
+                result.error = "User appears in more than one operation"
+                continue
+            seen.add(user_id)
+            if op == "add":
+                if user_id not in existing_users:
+                    result.status = "user_not_found"
+                elif user_id in members:
+                    result.status = "already_member"
+                else:
+                    operations.append(InsertOne({
+                        "_id": str(uuid.uuid4()),
+                        "user_id": user_id,
+                        "app_id": app_id,
+                        "roles": roles,
+                        "created_at": now,
+                    }))
+                    op_results.append(result)
+                    result.status = "added"
+            elif user_id not in members:
+                result.status = "not_member"
+            elif op == "remove":
+                operations.append(DeleteOne({"app_id": app_id, "user_id": user_id}))
+                op_results.append(result)
+                result.status = "removed"
+            else:
+                operations.append(UpdateOne({"app_id": app_id, "user_id": user_id}, {"$set": {"roles": roles}}))
+                op_results.append(result)
+                result.status = "updated"
+
+        if operations:
+            try:
+                await self.repository.bulk_write(operations)
+            except BulkWriteError as e:
+                for error in e.details["writeErrors"]:
+                    result = op_results[error["index"]]
+                    if error["code"] == 11000:
+                        # Added concurrently by another request
+                        result.status = "already_member"
+                    else:
+                        result.status = "error"
+                        result.error = error.get("errmsg")
+            finally:
+                for result in op_results:
+                    membership_cache.delete(result.user_id)
+        return results
\ No newline at end of file
@@ -0,0 +1,135 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+from fastapi import HTTPException, status
+from app.database import get_database
+from app.utils.pagination import KEYSET_SORT, encode_cursor, keyset_query
+
+# Exportable datasets and the fields they may expose; secrets are never listed
+EXPORT_FIELDS = {
+    "users": ["_id", "email", "name", "roles", "created_at"],
+    "apps": [
+        "_id", "name", "client_id", "redirect_uris", "description",
+        "logo_url", "website_url", "created_by", "created_at",
+    ],
+    "memberships": ["_id", "user_id", "app_id", "roles", "created_at"],
+}
+
+EXPORT_COLLECTIONS = {"users": "users", "apps": "apps", "memberships": "app_users"}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _csv_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ";".join(str(v) for v in value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class ExportService:
+    def __init__(self, dataset: str):
+        if dataset not in EXPORT_FIELDS:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Unknown export dataset"
+            )
+        self.dataset = dataset
+        # Exports are bulk reads that tolerate replication lag
+        self.db = get_database(secondary_ok=True)
+        self.collection = self.db[EXPORT_COLLECTIONS[dataset]]
+
+    def resolve_fields(self, fields: Optional[List[str]]) -> List[str]:
+        allowed = EXPORT_FIELDS[self.dataset]
+        if not fields:
+            return allowed
+        unknown = [field for field in fields if field not in allowed]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields for {self.dataset}: {', '.join(unknown)}"
+            )
+        return fields
+
+    async def iter_batches(
+        self,
+        fields: List[str],
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        checkpoint: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Tuple[List[dict], str]]:
+        """Yield (rows, checkpoint) per batch, in (created_at, _id) order.
+
+        Each batch is its own keyset query, so memory stays bounded by the
+        batch size, no server cursor is held open between batches, and an
+        export can resume from any checkpoint it emitted.
+        """
+        query = {}
+        if created_after or created_before:
+            query["created_at"] = {}
+            if created_after:
+                query["created_at"]["$gte"] = created_after
+            if created_before:
+                query["created_at"]["$lt"] = created_before
+        # The sort key is always fetched so the next checkpoint can be built
+        projection = {field: 1 for field in set(fields) | {"_id", "created_at"}}
+        while True:
+            rows = []
+            cursor = self.collection.find(keyset_query(query, checkpoint), projection)
+            async for doc in cursor.sort(KEYSET_SORT).limit(batch_size):
+                rows.append(doc)
+            if not rows:
+                return
+            checkpoint = encode_cursor([rows[-1].get("created_at"), rows[-1]["_id"]])
+            yield [{field: row.get(field) for field in fields} for row in rows], checkpoint
+            if len(rows) < batch_size:
+                return
+
+    async def stream(
+        self,
+        export_format: str,
+        fields: List[str],
+        include_checkpoints: bool = False,
+        **options,
+    ) -> AsyncIterator[bytes]:
+        """Encode batches as NDJSON or CSV.
+
+        With include_checkpoints, NDJSON output carries a
+        ``{"_checkpoint": ...}`` line after every batch, and CSV output a
+        trailing ``_checkpoint`` column that is filled in on the last row of
+        every batch. Pass the last checkpoint received back as ``checkpoint``
+        to resume; a resumed CSV export leaves out the header row so it can
+        be appended to what was already written.
+        """
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            if not options.get("checkpoint"):
+                writer.writerow(fields + ["_checkpoint"] if include_checkpoints else fields)
+                yield buffer.getvalue().encode()
+        async for rows, checkpoint in self.iter_batches(fields, **options):
+            if export_format == "csv":
+                buffer.seek(0)
+                buffer.truncate()
+                lines = [[_csv_value(row[field]) for field in fields] for row in rows]
+                if include_checkpoints:
+                    for line in lines[:-1]:
+                        line.append("")
+                    lines[-1].append(checkpoint)
+                writer.writerows(lines)
+                yield buffer.getvalue().encode()
+            else:
+                lines = [json.dumps(row, default=_json_default) for row in rows]
+                if include_checkpoints:
+                    lines.append(json.dumps({"_checkpoint": checkpoint}))
+                yield ("\n".join(lines) + "\n").encode()
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, Tuple
 from datetime import datetime, timedelta
 from app.database import get_database
 from app.models.token import TokenCreate, TokenInDB
@@ -11,36 +11,43 @@ class TokenService:
         self.db = get_database()
         self.collection = self.db.tokens
 
-    async def create_refresh_token(self, user_id: str, token: str) -> TokenInDB:
+    async def create_refresh_token(self, user_id: str, token: str, family_id: Optional[str] = None) -> TokenInDB:
         # Set expiration
         expires_at = datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
         
-        # Create token document with string ID
+        # Create token document with string ID; a new login starts a new family
+        token_id = str(uuid.uuid4())
         token_dict = {
-            "_id": str(uuid.uuid4()),
+            "_id": token_id,
             "user_id": user_id,
             "token": token,
+            "family_id": family_id or token_id,
             "expires_at": expires_at
         }
         
-        result = await self.collection.insert_one(token_dict)
-        
-        # Get created token
-        created_token = await self.collection.find_one({"_id": token_dict["_id"]})
-        return TokenInDB(**created_token)
+        await self.collection.insert_one(token_dict)
+        return TokenInDB(**token_dict)
 
-    async def get_refresh_token(self, token: str) -> Optional[TokenInDB]:
-        token_doc = await self.collection.find_one({"token": token})
-        if token_doc:
-            return TokenInDB(**token_doc)
-        return None
+    async def consume_refresh_token(self, token: str) -> Tuple[Optional[TokenInDB], bool]:
+        """Atomically mark a refresh token as used.
 
-    async def delete_refresh_token(self, token: str) -> bool:
-        try:
-            result = await self.collection.delete_one({"token": token})
-            return result.deleted_count > 0
-        except Exception:
-            return False
+        Returns the token document if this call consumed it. A token that was
+        already used signals theft or a replayed request: every token in its
+        family is revoked and the second value is True.
+        """
+        token_doc = await self.collection.find_one_and_update(
+            {"token": token, "used_at": None},
+            {"$set": {"used_at": datetime.utcnow()}}
+        )
+        if token_doc:
+            return TokenInDB(**token_doc), False
+        
+        # Only reached on failure: tell unknown tokens apart from reused ones
+        used_doc = await self.collection.find_one({"token": token}, {"family_id": 1})
+        if not used_doc:
+            return None, False
+        await self.collection.delete_many({"family_id": used_doc.get("family_id") or used_doc["_id"]})
+        return None, True
 
     async def delete_user_tokens(self, user_id: str) -> bool:
         """Delete all refresh tokens for a user (logout)"""
@@ -50,12 +57,17 @@ class TokenService:
         except Exception:
             return False
 
-    async def cleanup_expired_tokens(self) -> int:
-        """Remove expired tokens from database"""
-        try:
-            result = await self.collection.delete_many({
-                "expires_at": {"$lt": datetime.utcnow()}
-            })
-            return result.deleted_count
-        except Exception:
-            return 0 
\ No newline at end of file
+    async def cleanup_expired_tokens(self, limit: Optional[int] = None) -> int:
+        """Remove expired tokens from database, at most `limit` per call.
+
+        Database errors propagate so the scheduler counts and logs them.
+        """
+        expired = {"expires_at": {"$lt": datetime.utcnow()}}
+        if limit:
+            cursor = self.collection.find(expired, {"_id": 1}).limit(limit)
+            ids = [doc["_id"] async for doc in cursor]
+            if not ids:
+                return 0
+            expired = {"_id": {"$in": ids}}
+        result = await self.collection.delete_many(expired)
+        return result.deleted_count 
\ No newline at end of file
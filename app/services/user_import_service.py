@@ -0,0 +1,158 @@
+import csv
+import io
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import List, Tuple
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError
+from app.config import settings
+from app.database import get_database
+from app.models.user import UserCreate, BulkUserResult, BulkUserImportResponse
+from app.repositories.users import UserRepository
+from app.utils.hashing import hash_passwords
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+def parse_user_rows(content: bytes, import_format: str) -> List[Tuple[int, object]]:
+    """Split an NDJSON or CSV upload into (row number, raw row) pairs.
+
+    CSV needs a header with email, name and password; roles is optional and
+    separated by semicolons. Lines that can't be parsed come back as strings
+    so they are reported as invalid rather than failing the whole upload.
+    """
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload must be UTF-8 encoded"
+        )
+    rows = []
+    if import_format == "csv":
+        for row_number, row in enumerate(csv.DictReader(io.StringIO(text)), start=1):
+            # DictReader collects fields beyond the header under a None key
+            if None in row:
+                rows.append((row_number, "Row has more fields than the header"))
+                continue
+            if row.get("roles"):
+                row["roles"] = [role for role in row["roles"].split(";") if role]
+            else:
+                row.pop("roles", None)
+            rows.append((row_number, row))
+    else:
+        for row_number, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                rows.append((row_number, json.loads(line)))
+            except ValueError as e:
+                rows.append((row_number, f"Invalid JSON: {e}"))
+
+    if len(rows) > settings.bulk_import_max_rows:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.bulk_import_max_rows} rows per import"
+        )
+    return rows
+
+
+class UserImportService:
+    def __init__(self):
+        self.db = get_database()
+        self.collection = self.db.users
+        self.repository = UserRepository()
+
+    async def import_users(self, rows: List[Tuple[int, object]]) -> BulkUserImportResponse:
+        """Import rows chunk by chunk.
+
+        Chunks are committed as they go, so an import is not atomic. If the
+        password hasher turns a chunk away (503), that chunk and the rest are
+        reported as "failed" and nothing more is written; re-running the same
+        upload is safe, since rows that made it in come back as duplicates.
+        """
+        start = time.perf_counter()
+        results: List[BulkUserResult] = []
+        chunk_size = settings.bulk_import_chunk_size
+        for i in range(0, len(rows), chunk_size):
+            try:
+                results.extend(await self._import_chunk(rows[i:i + chunk_size]))
+            except HTTPException as e:
+                if e.status_code != status.HTTP_503_SERVICE_UNAVAILABLE:
+                    raise
+                results.extend(
+                    BulkUserResult(row=row_number, status="failed", error=e.detail)
+                    for row_number, _ in rows[i:]
+                )
+                break
+
+        seconds = time.perf_counter() - start
+        counts = {"created": 0, "duplicate": 0, "invalid": 0, "failed": 0}
+        for result in results:
+            counts[result.status] += 1
+        return BulkUserImportResponse(
+            **counts,
+            seconds=round(seconds, 3),
+            rows_per_sec=round(len(rows) / seconds, 1) if seconds else 0.0,
+            results=results,
+        )
+
+    async def _import_chunk(self, rows: List[Tuple[int, object]]) -> List[BulkUserResult]:
+        results = {}
+        valid = []
+        for row_number, raw in rows:
+            if not isinstance(raw, dict):
+                results[row_number] = BulkUserResult(row=row_number, status="invalid", error=str(raw))
+                continue
+            try:
+                valid.append((row_number, UserCreate(**raw)))
+            except ValidationError as e:
+                error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+                results[row_number] = BulkUserResult(
+                    row=row_number, status="invalid", email=raw.get("email"), error=error
+                )
+
+        # Skip bcrypt for emails that are already taken, e.g. when an upload is re-run;
+        # duplicates within the chunk or from concurrent writers are still caught below
+        if valid:
+            taken = await self.repository.existing_emails([user.email for _, user in valid])
+            for row_number, user in valid:
+                if user.email in taken:
+                    results[row_number] = BulkUserResult(
+                        row=row_number, status="duplicate", email=user.email, error="Email already registered"
+                    )
+            valid = [(row_number, user) for row_number, user in valid if user.email not in taken]
+
+        password_hashes = await hash_passwords([user.password for _, user in valid])
+        now = datetime.utcnow()
+        documents = []
+        for (row_number, user), password_hash in zip(valid, password_hashes):
+            user_dict = user.dict(exclude={"password"})
+            user_dict["_id"] = str(uuid.uuid4())
+            user_dict["password_hash"] = password_hash
+            user_dict["created_at"] = now
+            documents.append(user_dict)
+            results[row_number] = BulkUserResult(
+                row=row_number, status="created", id=user_dict["_id"], email=user.email
+            )
+
+        if documents:
+            # Unordered, so one duplicate does not stop the rest of the chunk
+            try:
+                await self.collection.bulk_write([InsertOne(doc) for doc in documents], ordered=False)
+            except BulkWriteError as e:
+                for error in e.details["writeErrors"]:
+                    row_number = valid[error["index"]][0]
+                    result = results[row_number]
+                    result.id = None
+                    if error["code"] == DUPLICATE_KEY_ERROR:
+                        result.status = "duplicate"
+                        result.error = "Email already registered"
+                    else:
+                        result.status = "invalid"
+                        result.error = error.get("errmsg")
+        return [results[row_number] for row_number, _ in rows]
\ No newline at end of file
@@ -1,60 +1,86 @@
-from typing import List, Optional
-from app.database import get_database
+from typing import List, Optional, Tuple
+from app.config import settings
 from app.models.user import UserCreate, UserUpdate, UserInDB, UserResponse
-from app.utils.auth import get_password_hash, verify_password
+from app.utils.hashing import hash_password, verify_password, needs_rehash
 from fastapi import HTTPException, status
+from pymongo.errors import DuplicateKeyError
+from app.repositories.users import UserRepository
+from app.services.app_user_service import membership_cache
+from app.utils.cache import TTLCache, NOT_FOUND
 from datetime import datetime
+import asyncio
+import logging
 import uuid
 
+logger = logging.getLogger(__name__)
+
+# Keeps fire-and-forget rehash tasks alive until they finish
+_background_tasks = set()
+
+# user_id -> UserResponse (never the password hash), or NOT_FOUND for unknown IDs
+user_cache = TTLCache("users", settings.entity_cache_size, settings.entity_cache_ttl_seconds)
+
 
 class UserService:
     def __init__(self):
-        self.db = get_database()
-        self.collection = self.db.users
+        self.repository = UserRepository()
+        # Listings may lag the primary; lookups used for authentication may not
+        self.listing_repository = UserRepository(secondary_ok=True)
 
     async def create_user(self, user_data: UserCreate) -> UserResponse:
-        # Check if user already exists
-        existing_user = await self.collection.find_one({"email": user_data.email})
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-        
         # Create user document with string ID
         user_dict = user_data.dict()
         user_dict["_id"] = str(uuid.uuid4())
-        user_dict["password_hash"] = get_password_hash(user_data.password)
+        user_dict["password_hash"] = await hash_password(user_data.password)
         user_dict["created_at"] = datetime.utcnow()
         del user_dict["password"]
         
-        result = await self.collection.insert_one(user_dict)
+        # The unique email index rejects duplicates
+        try:
+            await self.repository.insert(user_dict)
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
         
-        # Get created user
-        created_user = await self.collection.find_one({"_id": user_dict["_id"]})
-        return UserResponse(**created_user)
+        return UserResponse(**user_dict)
 
     async def get_user_by_id(self, user_id: str) -> Optional[UserResponse]:
-        try:
-            user = await self.collection.find_one({"_id": user_id})
-            if user:
-                return UserResponse(**user)
+        cached = user_cache.get(user_id)
+        if cached is NOT_FOUND:
             return None
+        if cached is not None:
+            # Callers may mutate what they get back
+            return cached.model_copy(deep=True)
+        try:
+            user_response = await self.repository.find_public(user_id)
         except Exception:
             return None
+        if not user_response:
+            user_cache.set(user_id, NOT_FOUND, settings.entity_cache_negative_ttl_seconds)
+            return None
+        user_cache.set(user_id, user_response)
+        return user_response.model_copy(deep=True)
 
     async def get_user_by_email(self, email: str) -> Optional[UserInDB]:
-        user = await self.collection.find_one({"email": email})
-        if user:
-            return UserInDB(**user)
-        return None
+        return await self.repository.find_credentials(email)
 
-    async def get_all_users(self) -> List[UserResponse]:
-        users = []
-        cursor = self.collection.find({})
-        async for user in cursor:
-            users.append(UserResponse(**user))
-        return users
+    async def get_all_users(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        role: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        include_total: bool = False,
+        raw: bool = False,
+    ) -> Tuple[List[UserResponse], Optional[str], Optional[int]]:
+        query = {}
+        if role:
+            query["roles"] = role
+        if created_after:
+            query["created_at"] = {"$gt": created_after}
+        return await self.listing_repository.page(query, limit, cursor, include_total, raw)
 
     async def update_user(self, user_id: str, user_data: UserUpdate) -> Optional[UserResponse]:
         try:
@@ -62,12 +88,10 @@ class UserService:
             if not update_data:
                 return await self.get_user_by_id(user_id)
             
-            result = await self.collection.update_one(
-                {"_id": user_id},
-                {"$set": update_data}
-            )
+            modified = await self.repository.update(user_id, update_data)
+            user_cache.delete(user_id)
             
-            if result.modified_count:
+            if modified:
                 return await self.get_user_by_id(user_id)
             return None
         except Exception:
@@ -75,8 +99,10 @@ class UserService:
 
     async def delete_user(self, user_id: str) -> bool:
         try:
-            result = await self.collection.delete_one({"_id": user_id})
-            return result.deleted_count > 0
+            deleted = await self.repository.delete(user_id)
+            user_cache.delete(user_id)
+            membership_cache.delete(user_id)
+            return deleted
         except Exception:
             return False
 
@@ -84,6 +110,18 @@ class UserService:
         user = await self.get_user_by_email(email)
         if not user:
             return None
-        if not verify_password(password, user.password_hash):
+        if not await verify_password(password, user.password_hash):
             return None
-        return user 
\ No newline at end of file
+        if needs_rehash(user.password_hash):
+            task = asyncio.create_task(self._rehash_password(user.id, password, user.password_hash))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+        return user
+
+    async def _rehash_password(self, user_id: str, password: str, old_hash: str) -> None:
+        """Upgrade a stale or overly expensive hash to the current bcrypt cost"""
+        try:
+            new_hash = await hash_password(password)
+            await self.repository.replace_password_hash(user_id, old_hash, new_hash)
+        except Exception:
+            logger.exception("Failed to rehash password for user %s", user_id) 
\ No newline at end of file
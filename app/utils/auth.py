@@ -1,14 +1,29 @@
+from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
+from typing import Optional, Tuple
+from jose import ExpiredSignatureError, JWTError, jwk, jwt
 from passlib.context import CryptContext
 from app.config import settings
 from app.models.auth import TokenData
+from app.utils.cache import TTLCache
+from app.utils.keys import SigningKey, key_ring
+from app.utils.metrics import jwt_duration
+import hashlib
+import math
 import secrets
 import string
+import time
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+TOKEN_VALID = "valid"
+TOKEN_EXPIRED = "expired"
+TOKEN_INVALID = "invalid"
+TOKEN_MALFORMED = "malformed"
+
+# Decoded claims of recently verified tokens, keyed by the token's SHA-256 digest
+token_cache = TTLCache("verified_tokens", settings.token_cache_size, settings.token_cache_ttl_seconds)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -18,6 +33,194 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def password_needs_update(hashed_password: str) -> bool:
+    """True if the hash uses a deprecated scheme or rounds outside the configured band"""
+    return pwd_context.needs_update(hashed_password)
+
+
+def configure_bcrypt_rounds(rounds: int) -> None:
+    """Hash new passwords with `rounds`; flag stored hashes below it or too far above it"""
+    pwd_context.update(
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds + settings.bcrypt_rehash_tolerance,
+    )
+
+
+def calibrate_bcrypt_rounds(
+    target_ms: Optional[float] = None,
+    min_rounds: Optional[int] = None,
+    max_rounds: Optional[int] = None,
+    samples: int = 3,
+) -> int:
+    """Pick the bcrypt rounds whose single-core hash time is closest to target_ms.
+
+    Each extra round doubles the cost, so timing the cheapest allowed setting
+    is enough to extrapolate the rest.
+    """
+    target_ms = target_ms or settings.bcrypt_target_ms
+    min_rounds = min_rounds or settings.bcrypt_min_rounds
+    max_rounds = max_rounds or settings.bcrypt_max_rounds
+
+    handler = pwd_context.handler("bcrypt").using(rounds=min_rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        handler.hash("calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    base_ms = min(timings)
+
+    rounds = min_rounds + round(math.log2(target_ms / base_ms))
+    return max(min_rounds, min(max_rounds, rounds))
+
+
+class TokenError(Exception):
+    """A token failed verification"""
+
+
+class TokenExpiredError(TokenError):
+    pass
+
+
+class TokenMalformedError(TokenError):
+    pass
+
+
+class JWTCodec(ABC):
+    """Interface for the JWT library that mints and verifies access tokens.
+
+    Backends raise TokenExpiredError / TokenMalformedError / TokenError
+    instead of their own exception types.
+    """
+
+    name: str = ""
+    algorithms: frozenset = frozenset()
+
+    @abstractmethod
+    def prepare_signing_key(self, key: SigningKey):
+        """Parse a key's private material into the form encode() takes"""
+
+    @abstractmethod
+    def prepare_verification_key(self, key: SigningKey):
+        """Parse a key's public material into the form decode() takes"""
+
+    @abstractmethod
+    def encode(self, claims: dict, prepared_key, algorithm: str, headers: Optional[dict] = None) -> str:
+        pass
+
+    @abstractmethod
+    def decode(self, token: str, prepared_key, algorithm: str) -> dict:
+        pass
+
+    @abstractmethod
+    def get_unverified_header(self, token: str) -> dict:
+        pass
+
+    def signing_key(self, key: SigningKey):
+        """The prepared signing key, built once per key and backend"""
+        prepared = key.prepared.get((self.name, "sign"))
+        if prepared is None:
+            prepared = key.prepared[(self.name, "sign")] = self.prepare_signing_key(key)
+        return prepared
+
+    def verification_key(self, key: SigningKey):
+        """The prepared verification key, built once per key and backend"""
+        prepared = key.prepared.get((self.name, "verify"))
+        if prepared is None:
+            prepared = key.prepared[(self.name, "verify")] = self.prepare_verification_key(key)
+        return prepared
+
+
+class JoseCodec(JWTCodec):
+    name = "jose"
+    algorithms = frozenset({"HS256", "HS384", "HS512", "RS256", "RS384", "RS512", "ES256", "ES384", "ES512"})
+
+    def prepare_signing_key(self, key: SigningKey):
+        return jwk.construct(key.secret or key.private_pem, key.algorithm)
+
+    def prepare_verification_key(self, key: SigningKey):
+        return jwk.construct(key.secret or key.public_pem, key.algorithm)
+
+    def encode(self, claims: dict, prepared_key, algorithm: str, headers: Optional[dict] = None) -> str:
+        return jwt.encode(claims, prepared_key, algorithm=algorithm, headers=headers)
+
+    def decode(self, token: str, prepared_key, algorithm: str) -> dict:
+        try:
+            return jwt.decode(token, prepared_key, algorithms=[algorithm])
+        except ExpiredSignatureError:
+            raise TokenExpiredError()
+        except JWTError as e:
+            self.get_unverified_header(token)
+            raise TokenError(str(e))
+
+    def get_unverified_header(self, token: str) -> dict:
+        try:
+            return jwt.get_unverified_header(token)
+        except JWTError as e:
+            raise TokenMalformedError(str(e))
+
+
+class PyJWTCodec(JWTCodec):
+    name = "pyjwt"
+    algorithms = frozenset({
+        "HS256", "HS384", "HS512", "RS256", "RS384", "RS512",
+        "ES256", "ES384", "ES512", "PS256", "PS384", "PS512", "EdDSA",
+    })
+
+    def __init__(self):
+        import jwt as pyjwt
+        from jwt.algorithms import get_default_algorithms
+
+        self._jwt = pyjwt
+        self._algorithms = get_default_algorithms()
+
+    def prepare_signing_key(self, key: SigningKey):
+        return self._algorithms[key.algorithm].prepare_key(key.secret or key.private_pem)
+
+    def prepare_verification_key(self, key: SigningKey):
+        return self._algorithms[key.algorithm].prepare_key(key.secret or key.public_pem)
+
+    def encode(self, claims: dict, prepared_key, algorithm: str, headers: Optional[dict] = None) -> str:
+        return self._jwt.encode(claims, prepared_key, algorithm=algorithm, headers=headers)
+
+    def decode(self, token: str, prepared_key, algorithm: str) -> dict:
+        try:
+            return self._jwt.decode(token, prepared_key, algorithms=[algorithm])
+        except self._jwt.ExpiredSignatureError:
+            raise TokenExpiredError()
+        except self._jwt.InvalidSignatureError as e:
+            raise TokenError(str(e))
+        except self._jwt.DecodeError as e:
+            raise TokenMalformedError(str(e))
+        except self._jwt.InvalidTokenError as e:
+            raise TokenError(str(e))
+
+    def get_unverified_header(self, token: str) -> dict:
+        try:
+            return self._jwt.get_unverified_header(token)
+        except self._jwt.InvalidTokenError as e:
+            raise TokenMalformedError(str(e))
+
+
+JWT_BACKENDS = {"jose": JoseCodec, "pyjwt": PyJWTCodec}
+
+_codec: Optional[JWTCodec] = None
+
+
+def get_codec() -> JWTCodec:
+    global _codec
+    if _codec is None:
+        try:
+            backend = JWT_BACKENDS[settings.jwt_backend]
+        except KeyError:
+            raise ValueError(f"Unknown JWT backend: {settings.jwt_backend}")
+        try:
+            _codec = backend()
+        except ImportError:
+            raise ValueError(f"JWT backend {settings.jwt_backend} is not installed")
+    return _codec
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -25,28 +228,66 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+    codec = get_codec()
+    signing_key = key_ring.active
+    headers = {"kid": signing_key.kid} if signing_key.kid else None
+    with jwt_duration.time(operation="encode"):
+        encoded_jwt = codec.encode(to_encode, codec.signing_key(signing_key), signing_key.algorithm, headers)
     return encoded_jwt
 
 
+def _decode(token: str) -> dict:
+    codec = get_codec()
+    verification_key = key_ring.get(codec.get_unverified_header(token).get("kid"))
+    if verification_key is None:
+        raise TokenError("Unknown signing key")
+    with jwt_duration.time(operation="decode"):
+        return codec.decode(token, codec.verification_key(verification_key), verification_key.algorithm)
+
+
 def create_refresh_token() -> str:
     """Generate a random refresh token"""
     alphabet = string.ascii_letters + string.digits
     return ''.join(secrets.choice(alphabet) for _ in range(64))
 
 
-def verify_token(token: str) -> Optional[TokenData]:
+def inspect_token(token: str) -> Tuple[str, Optional[TokenData]]:
+    """Verify a token and classify the outcome.
+
+    Returns one of the TOKEN_* result codes, plus the claims when valid.
+    """
+    cache_key = hashlib.sha256(token.encode()).digest()
+    token_data = token_cache.get(cache_key)
+    if token_data is not None:
+        return TOKEN_VALID, token_data
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        user_id: str = payload.get("sub")
-        email: str = payload.get("email")
-        roles: list = payload.get("roles", [])
-        if user_id is None:
-            return None
-        token_data = TokenData(user_id=user_id, email=email, roles=roles)
-        return token_data
-    except JWTError:
-        return None
+        payload = _decode(token)
+    except TokenExpiredError:
+        return TOKEN_EXPIRED, None
+    except TokenMalformedError:
+        return TOKEN_MALFORMED, None
+    except TokenError:
+        return TOKEN_INVALID, None
+    user_id: str = payload.get("sub")
+    email: str = payload.get("email")
+    roles: list = payload.get("roles", [])
+    if user_id is None:
+        return TOKEN_INVALID, None
+    token_data = TokenData(user_id=user_id, email=email, roles=roles)
+    # Never keep a token cached past its own expiry
+    exp = payload.get("exp")
+    ttl = exp - time.time() if exp is not None else None
+    token_cache.set(cache_key, token_data, ttl)
+    return TOKEN_VALID, token_data
+
+
+def verify_token(token: str) -> Optional[TokenData]:
+    return inspect_token(token)[1]
+
+
+def clear_token_cache() -> None:
+    """Drop all cached verifications, e.g. after a signing key rotation"""
+    token_cache.clear()
 
 
 def generate_client_id() -> str:
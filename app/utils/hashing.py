@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+from fastapi import HTTPException, status
+from app.config import settings
+from app.utils import auth
+from app.utils.metrics import password_hash_duration
+
+logger = logging.getLogger(__name__)
+
+
+def _pool_context():
+    # Forking a process that already runs Motor's and pymongo's threads can copy
+    # their locks in a held state into the child, so workers are started cleanly
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(start_method)
+
+
+def _hash_in_worker(password: str) -> str:
+    return auth.get_password_hash(password)
+
+
+def _hash_batch_in_worker(passwords: List[str]) -> List[str]:
+    return [auth.get_password_hash(password) for password in passwords]
+
+
+def _verify_in_worker(plain_password: str, hashed_password: str) -> bool:
+    return auth.verify_password(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """Runs bcrypt hashing and verification in a dedicated process pool.
+
+    At most ``workers`` jobs run at once; up to ``max_queue`` more may wait for
+    a free worker. Anything beyond that is rejected with a 503 instead of
+    piling up behind a login burst.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_queue: Optional[int] = None):
+        self.workers = workers or settings.password_hash_workers or os.cpu_count() or 1
+        self.max_queue = max_queue if max_queue is not None else settings.password_hash_queue_size
+        self.rounds: Optional[int] = settings.bcrypt_rounds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def calibrate(self):
+        """Settle the bcrypt rounds for this node before the pool starts"""
+        if self.rounds is None:
+            self.rounds = await asyncio.to_thread(auth.calibrate_bcrypt_rounds)
+            logger.info(
+                "Calibrated bcrypt to %d rounds for a %.0f ms target",
+                self.rounds, settings.bcrypt_target_ms,
+            )
+        auth.configure_bcrypt_rounds(self.rounds)
+        # Workers pick the rounds up from their initializer, so restart them
+        self.shutdown()
+
+    def start(self):
+        if self._executor is None:
+            initargs = (self.rounds,) if self.rounds is not None else ()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=_pool_context(),
+                initializer=auth.configure_bcrypt_rounds if initargs else None,
+                initargs=initargs,
+            )
+            self._slots = asyncio.Semaphore(self.workers)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._slots = None
+
+    async def _run(self, fn, *args, operation: str = "hash"):
+        self.start()
+        if self.queued >= self.max_queue and self._slots.locked():
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Password hashing queue is full, try again later",
+                headers={"Retry-After": "1"},
+            )
+
+        enqueued_at = time.perf_counter()
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+        wait = time.perf_counter() - enqueued_at
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+        self.running += 1
+        started_at = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            password_hash_duration.observe(time.perf_counter() - started_at, operation=operation)
+            self.running -= 1
+            self.completed += 1
+            self._slots.release()
+
+    async def hash_password(self, password: str) -> str:
+        return await self._run(_hash_in_worker, password)
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(_verify_in_worker, plain_password, hashed_password, operation="verify")
+
+    async def hash_many(self, passwords: List[str], chunk_size: int = 16) -> List[str]:
+        """Hash a batch across all workers.
+
+        Work is submitted in small chunks, at most one waiting per worker, so
+        the batch never overflows the queue and interactive logins still get
+        a worker between chunks.
+        """
+        chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+        in_flight = asyncio.Semaphore(self.workers)
+
+        async def hash_chunk(chunk: List[str]) -> List[str]:
+            async with in_flight:
+                return await self._run(_hash_batch_in_worker, chunk, operation="hash_batch")
+
+        results = await asyncio.gather(*(hash_chunk(chunk) for chunk in chunks))
+        return [hashed for chunk in results for hashed in chunk]
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "bcrypt_rounds": self.rounds,
+            "max_queue": self.max_queue,
+            "queue_depth": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait / self.completed * 1000, 3) if self.completed else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
+
+hasher = PasswordHasher()
+
+
+async def hash_password(password: str) -> str:
+    return await hasher.hash_password(password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await hasher.verify_password(plain_password, hashed_password)
+
+
+async def hash_passwords(passwords: List[str]) -> List[str]:
+    return await hasher.hash_many(passwords)
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    return auth.password_needs_update(hashed_password)
\ No newline at end of file
@@ -0,0 +1,174 @@
+import base64
+import logging
+import os
+import secrets
+from typing import Any, Dict, List, Optional
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from jose import jwk
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SigningKey:
+    """Key material for one kid.
+
+    ``secret`` is set for HS* keys, the PEMs for asymmetric ones. Codecs
+    stash their parsed form of the material in ``prepared`` so it is only
+    built once per key rather than on every encode/decode.
+    """
+
+    def __init__(
+        self,
+        kid: Optional[str],
+        algorithm: str,
+        public_pem: Optional[bytes] = None,
+        private_pem: Optional[bytes] = None,
+        secret: Optional[str] = None,
+    ):
+        self.kid = kid
+        self.algorithm = algorithm
+        self.public_pem = public_pem
+        self.private_pem = private_pem
+        self.secret = secret
+        self.prepared: Dict[Any, Any] = {}
+
+    @classmethod
+    def from_pem(cls, kid: Optional[str], algorithm: str, pem: bytes) -> "SigningKey":
+        """A signing key from a private key PEM, or a verify-only key from a public one"""
+        if b"PRIVATE KEY" in pem:
+            private_key = serialization.load_pem_private_key(pem, password=None)
+            public_pem = private_key.public_key().public_bytes(
+                serialization.Encoding.PEM,
+                serialization.PublicFormat.SubjectPublicKeyInfo,
+            )
+            return cls(kid, algorithm, public_pem, pem)
+        return cls(kid, algorithm, pem)
+
+    @classmethod
+    def generate(cls, kid: Optional[str], algorithm: str) -> "SigningKey":
+        """A fresh signing key; HS* keys get a random secret"""
+        if algorithm.startswith("HS"):
+            return cls(kid, algorithm, secret=secrets.token_urlsafe(32))
+        return cls.from_pem(kid, algorithm, _generate_private_pem(algorithm))
+
+    @property
+    def can_sign(self) -> bool:
+        return self.private_pem is not None or self.secret is not None
+
+    def to_jwk(self) -> dict:
+        if self.algorithm == "EdDSA":
+            # python-jose has no OKP support, so build the Ed25519 JWK by hand
+            public_key = serialization.load_pem_public_key(self.public_pem)
+            raw = public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+            public_jwk = {
+                "alg": "EdDSA",
+                "kty": "OKP",
+                "crv": "Ed25519",
+                "x": base64.urlsafe_b64encode(raw).rstrip(b"=").decode(),
+            }
+        else:
+            public_jwk = jwk.construct(self.public_pem, self.algorithm).to_dict()
+        public_jwk.update({"kid": self.kid, "use": "sig"})
+        return public_jwk
+
+
+class KeyRing:
+    """Keys used to sign and verify access tokens.
+
+    With an HS* algorithm the ring holds a single unpublished key built from
+    ``settings.secret_key`` and tokens carry no kid. Otherwise keys are read from ``settings.signing_keys_dir``: every ``<kid>.pem`` file
+    holds either a private key (able to sign) or a public key (verify only).
+    Exactly one private key, ``settings.signing_key_id``, signs new tokens;
+    all others stay valid for verification and are published in the JWKS, so
+    keys can be rotated with overlap:
+
+    1. add the new key file - it is published but not used yet
+    2. once JWKS caches have refreshed, point SIGNING_KEY_ID at it
+    3. once tokens signed by the old key have expired, remove its file
+    """
+
+    def __init__(self):
+        self.keys: Dict[str, SigningKey] = {}
+        self.active_kid: Optional[str] = None
+        self.loaded = False
+
+    def load(self) -> None:
+        from app.utils.auth import clear_token_cache, get_codec
+
+        self.keys = {}
+        self.active_kid = None
+        algorithm = settings.algorithm
+        codec = get_codec()
+        if algorithm not in codec.algorithms:
+            raise ValueError(
+                f"Token signing algorithm {algorithm} is not supported by the {codec.name} JWT backend"
+            )
+        if algorithm.startswith("HS"):
+            self.keys[None] = SigningKey(None, algorithm, secret=settings.secret_key)
+            self.loaded = True
+            clear_token_cache()
+            return
+
+        if settings.signing_keys_dir:
+            for filename in sorted(os.listdir(settings.signing_keys_dir)):
+                if filename.endswith(".pem"):
+                    path = os.path.join(settings.signing_keys_dir, filename)
+                    with open(path, "rb") as f:
+                        kid = filename[:-len(".pem")]
+                        self.keys[kid] = SigningKey.from_pem(kid, algorithm, f.read())
+        else:
+            logger.warning(
+                "No SIGNING_KEYS_DIR configured; generated an ephemeral %s key. "
+                "Tokens will not survive a restart or validate across replicas.",
+                algorithm,
+            )
+            self.keys["ephemeral"] = SigningKey.generate("ephemeral", algorithm)
+
+        signing_kids = [kid for kid, key in self.keys.items() if key.can_sign]
+        if settings.signing_key_id:
+            self.active_kid = settings.signing_key_id
+        elif len(signing_kids) == 1:
+            self.active_kid = signing_kids[0]
+        if self.active_kid not in signing_kids:
+            raise ValueError(
+                "SIGNING_KEY_ID must name one of the private keys in SIGNING_KEYS_DIR"
+            )
+        self.loaded = True
+        clear_token_cache()
+
+    def _ensure_loaded(self) -> None:
+        if not self.loaded:
+            self.load()
+
+    @property
+    def active(self) -> SigningKey:
+        self._ensure_loaded()
+        return self.keys[self.active_kid]
+
+    def get(self, kid: Optional[str]) -> Optional[SigningKey]:
+        self._ensure_loaded()
+        return self.keys.get(kid)
+
+    def jwks(self) -> Dict[str, List[dict]]:
+        self._ensure_loaded()
+        return {"keys": [key.to_jwk() for key in self.keys.values() if key.public_pem is not None]}
+
+
+def _generate_private_pem(algorithm: str) -> bytes:
+    if algorithm.startswith("RS"):
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif algorithm == "EdDSA":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        curve = {"ES256": ec.SECP256R1, "ES384": ec.SECP384R1, "ES512": ec.SECP521R1}[algorithm]
+        private_key = ec.generate_private_key(curve())
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+
+
+key_ring = KeyRing()
\ No newline at end of file
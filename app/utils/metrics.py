@@ -0,0 +1,281 @@
+import bisect
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Latency buckets in seconds, from sub-millisecond cache hits to slow bcrypt calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Starlette appends "; charset=utf-8" to text/* media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in labels]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(ABC):
+    """Base for metrics in the Prometheus text exposition format.
+
+    Updates may come from executor threads (pymongo listeners), so every
+    metric guards its samples with a lock.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> List[Tuple[str, Tuple[Tuple[str, str], ...], float]]:
+        """(sample name, label pairs, value) for every series of this metric"""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, tuple(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> (per-bucket counts, sum, count); counts are not cumulative until rendered
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def time(self, **labels) -> "_Timer":
+        return _Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._values.items()]
+        samples = []
+        for key, counts, total, count in items:
+            labels = tuple(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                samples.append((f"{self.name}_bucket", labels + (("le", _format_value(bound)),), cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+class _Timer:
+    """Context manager observing the elapsed wall time of its block"""
+
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+
+class Registry:
+    """Metrics plus collectors that read other components' stats at scrape time"""
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self.collectors: List[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[Metric]]) -> None:
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        for collector in self.collectors:
+            for metric in collector():
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP responses by method, route template and status code",
+    ("method", "route", "status"),
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route template",
+    ("method", "route"),
+)
+http_requests_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests currently being served")
+mongodb_command_duration = registry.histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency by collection and command",
+    ("collection", "command"),
+)
+mongodb_command_failures = registry.counter(
+    "mongodb_command_failures_total", "Failed MongoDB commands by collection and command",
+    ("collection", "command"),
+)
+password_hash_duration = registry.histogram(
+    "password_hash_duration_seconds", "bcrypt time in the worker pool, excluding queueing, by operation",
+    ("operation",),
+)
+jwt_duration = registry.histogram(
+    "jwt_duration_seconds", "JWT signing and verification time by operation",
+    ("operation",), buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025),
+)
+
+
+def stats_metrics(
+    prefix: str,
+    help: str,
+    stats: Dict[str, Dict[str, object]],
+    label: str,
+    counters: Iterable[str] = (),
+) -> List[Metric]:
+    """One metric per numeric stat in a {name: {stat: value}} mapping, labelled by name.
+
+    Stats named in `counters` only ever grow and are exported as counters
+    (``<prefix>_<stat>_total``) so rate() works on them; the rest are
+    point-in-time gauges.
+    """
+    counters = set(counters)
+    metrics: Dict[str, Metric] = {}
+    for name, values in stats.items():
+        for stat, value in values.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            metric = metrics.get(stat)
+            if stat in counters:
+                if metric is None:
+                    # total_removed -> <prefix>_removed_total
+                    base = stat[len("total_"):] if stat.startswith("total_") else stat
+                    metric = metrics[stat] = Counter(f"{prefix}_{base}_total", f"{help}: {stat}", (label,))
+                metric.inc(value, **{label: name})
+            else:
+                if metric is None:
+                    metric = metrics[stat] = Gauge(f"{prefix}_{stat}", f"{help}: {stat}", (label,))
+                metric.set(value, **{label: name})
+    return list(metrics.values())
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and in-flight counts per route.
+
+    Requests are labelled with the route template (``/api/v1/apps/{app_id}``)
+    rather than the raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths: Optional[Dict[object, str]] = None
+
+    def _route(self, scope) -> str:
+        if self._route_paths is None:
+            routes = scope["app"].routes
+            self._route_paths = {route.endpoint: route.path for route in routes if hasattr(route, "endpoint")}
+        return self._route_paths.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            route = self._route(scope)
+            http_request_duration.observe(time.perf_counter() - start, method=scope["method"], route=route)
+            http_requests.inc(method=scope["method"], route=route, status=status_code)
\ No newline at end of file
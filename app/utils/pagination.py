@@ -0,0 +1,103 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple, Type
+from fastapi import HTTPException, Request, Response, status
+from pydantic import BaseModel
+from app.utils.serialization import row_shape
+
+# List endpoints page through documents in creation order
+KEYSET_SORT = [("created_at", 1), ("_id", 1)]
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Opaque cursor for keyset pagination: the sort key of the last item on a page"""
+    payload = [{"$date": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, list):
+            raise ValueError("cursor payload is not a list")
+        return [
+            datetime.fromisoformat(v["$date"]) if isinstance(v, dict) else v
+            for v in payload
+        ]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def set_pagination_headers(
+    response: Response,
+    request: Request,
+    next_cursor: Optional[str],
+    total: Optional[int] = None,
+) -> None:
+    """Point clients at the next page via X-Next-Cursor and an RFC 8288 Link header"""
+    if next_cursor:
+        next_url = request.url.include_query_params(cursor=next_cursor)
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+
+
+def decode_keyset_cursor(cursor: str) -> List[Any]:
+    """Decode a (created_at, _id) cursor, raising a 400 if it is not one"""
+    values = decode_cursor(cursor)
+    if len(values) != 2:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return values
+
+
+def keyset_query(query: dict, cursor: Optional[str]) -> dict:
+    """Restrict `query` to documents sorting after the cursor's (created_at, _id)"""
+    if not cursor:
+        return query
+    created_at, last_id = decode_keyset_cursor(cursor)
+    after = {"$or": [
+        {"created_at": {"$gt": created_at}},
+        {"created_at": created_at, "_id": {"$gt": last_id}},
+    ]}
+    return {"$and": [query, after]} if query else after
+
+
+async def paginate(
+    collection,
+    query: dict,
+    model: Type[BaseModel],
+    limit: int,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    raw: bool = False,
+) -> Tuple[List[Any], Optional[str], Optional[int]]:
+    """Fetch one page in KEYSET_SORT order.
+
+    Returns the items, the cursor for the next page (None on the last page)
+    and, if asked for, the number of documents matching `query` overall.
+    With `raw`, items are plain dicts in the model's JSON shape (see
+    RowShape), fetched with a projection and never validated.
+    """
+    items = []
+    next_cursor = None
+    shape = row_shape(model) if raw else None
+    projection = shape.projection if raw else None
+    docs = collection.find(keyset_query(query, cursor), projection).sort(KEYSET_SORT).limit(limit + 1)
+    last = None
+    async for doc in docs:
+        if len(items) == limit:
+            next_cursor = encode_cursor([last.get("created_at"), last["_id"]])
+            break
+        items.append(shape.row(doc) if raw else model(**doc))
+        last = doc
+    total = await collection.count_documents(query) if include_total else None
+    return items, next_cursor, total
\ No newline at end of file
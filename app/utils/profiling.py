@@ -0,0 +1,203 @@
+import cProfile
+import contextvars
+import hashlib
+import hmac
+import io
+import logging
+import pstats
+import random
+import threading
+import time
+from collections import Counter
+from typing import List, Optional
+from pymongo import monitoring
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+slow_logger = logging.getLogger("app.slow_requests")
+
+PROFILE_HEADER = "x-profile"
+
+# Only one cProfile profiler can be attached to the event loop thread at a time
+_profiler_lock = threading.Lock()
+
+
+def command_collection(event) -> str:
+    """The collection a command started event targets, or "" for database commands"""
+    if event.command_name in ("getMore", "killCursors"):
+        # getMore carries the cursor ID under its own name and the collection separately
+        collection = event.command.get("collection", event.command.get(event.command_name))
+    else:
+        collection = event.command.get(event.command_name)
+    return collection if isinstance(collection, str) else ""
+
+
+class RequestTrace:
+    """The Mongo commands one request issued, in order, with offsets from its start"""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.start = time.perf_counter()
+        self.commands: List[dict] = []
+        self._started = {}
+
+    def command_started(self, event) -> None:
+        self._started[(event.connection_id, event.request_id)] = (time.perf_counter(), command_collection(event))
+
+    def command_finished(self, event, ok: bool) -> None:
+        started_at, collection = self._started.pop(
+            (event.connection_id, event.request_id), (time.perf_counter(), "")
+        )
+        self.commands.append({
+            "offset_ms": round((started_at - self.start) * 1000, 3),
+            "collection": collection,
+            "command": event.command_name,
+            "duration_ms": round(event.duration_micros / 1000, 3),
+            "ok": ok,
+        })
+
+    @property
+    def db_ms(self) -> float:
+        return round(sum(command["duration_ms"] for command in self.commands), 3)
+
+    def repeated_commands(self) -> dict:
+        """(collection, command) pairs issued more than once, the usual sign of an N+1"""
+        counts = Counter(f"{c['collection']}.{c['command']}" for c in self.commands)
+        return {name: count for name, count in counts.most_common() if count > 1}
+
+
+# Motor runs pymongo calls with a copy of the caller's context, so listeners see the request's trace
+current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar("current_trace", default=None)
+
+
+class CommandTrace(monitoring.CommandListener):
+    """Adds every Mongo command to the trace of the request that issued it"""
+
+    def started(self, event):
+        trace = current_trace.get()
+        if trace is not None:
+            trace.command_started(event)
+
+    def succeeded(self, event):
+        trace = current_trace.get()
+        if trace is not None:
+            trace.command_finished(event, ok=True)
+
+    def failed(self, event):
+        trace = current_trace.get()
+        if trace is not None:
+            trace.command_finished(event, ok=False)
+
+
+command_trace = CommandTrace()
+
+
+def sign_profile_request(method: str, path: str, timestamp: Optional[int] = None) -> str:
+    """Value for the X-Profile header: '<unix time>.<HMAC-SHA256 of time, method and path>'"""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    message = f"{timestamp}:{method.upper()}:{path}".encode()
+    signature = hmac.new(settings.profiling_secret.encode(), message, hashlib.sha256).hexdigest()
+    return f"{timestamp}.{signature}"
+
+
+def _valid_signature(value: str, method: str, path: str) -> bool:
+    if not settings.profiling_secret:
+        return False
+    timestamp, _, _ = value.partition(".")
+    if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > settings.profiling_signature_max_age_seconds:
+        return False
+    return hmac.compare_digest(value, sign_profile_request(method, path, int(timestamp)))
+
+
+def top_frames(profiler: cProfile.Profile, limit: int) -> List[dict]:
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+        rows.append({
+            "function": f"{filename}:{line}({function})",
+            "calls": calls,
+            "own_ms": round(own * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        })
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:limit]
+
+
+class ProfilingMiddleware:
+    """Opt-in request profiling and the slow-request log.
+
+    Every request gets a RequestTrace of its Mongo commands. A request is
+    also run under cProfile when it carries a valid signed X-Profile header
+    or is picked by PROFILING_SAMPLE_RATE. Profiled requests are logged with
+    their top frames and command timeline and answer with a Server-Timing
+    header; any request slower than SLOW_REQUEST_MS is logged with its query
+    count, repeated queries and, if it was profiled, its top frames.
+
+    cProfile sees everything the event loop runs while the request is in
+    flight, so profiles of concurrent requests overlap; only one request is
+    profiled at a time.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _wants_profile(self, scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER.encode():
+                return _valid_signature(value.decode("latin-1"), scope["method"], scope["path"])
+        return settings.profiling_sample_rate > 0 and random.random() < settings.profiling_sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(scope["method"], scope["path"])
+        token = current_trace.set(trace)
+        profiler = None
+        if self._wants_profile(scope) and _profiler_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+
+        async def send_wrapper(message):
+            if profiler is not None and message["type"] == "http.response.start":
+                elapsed_ms = (time.perf_counter() - trace.start) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={trace.db_ms};desc="{len(trace.commands)} queries", app;dur={elapsed_ms:.3f}'.encode(),
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            if profiler is not None:
+                profiler.enable()
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                _profiler_lock.release()
+            current_trace.reset(token)
+            self._report(trace, profiler)
+
+    def _report(self, trace: RequestTrace, profiler: Optional[cProfile.Profile]) -> None:
+        duration_ms = round((time.perf_counter() - trace.start) * 1000, 3)
+        slow = duration_ms >= settings.slow_request_ms
+        if profiler is None and not slow:
+            return
+        report = {
+            "method": trace.method,
+            "path": trace.path,
+            "duration_ms": duration_ms,
+            "queries": len(trace.commands),
+            "db_ms": trace.db_ms,
+            "repeated_queries": trace.repeated_commands(),
+        }
+        if profiler is not None:
+            report["top_frames"] = top_frames(profiler, settings.profiling_top_frames)
+            report["timeline"] = trace.commands
+        if slow:
+            slow_logger.warning("Slow request: %s", report)
+        else:
+            logger.info("Request profile: %s", report)
\ No newline at end of file
@@ -0,0 +1,137 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+from fastapi import HTTPException, Request, status
+from app.config import settings
+from app.utils.hashing import hasher
+from app.utils.metrics import registry
+
+admission_rejections = registry.counter(
+    "admission_rejections_total", "Requests turned away by admission control, by endpoint and reason",
+    ("endpoint", "reason"),
+)
+
+
+class TokenBuckets:
+    """Per-key token buckets kept in a bounded LRU.
+
+    A key that has not been seen for a while is evicted; it would have
+    refilled to a full bucket anyway, so eviction only ever errs on the side
+    of admitting. Not thread-safe; meant to be used from the event loop only.
+    """
+
+    def __init__(self, name: str, rate_per_minute: float, burst: int, maxsize: int):
+        self.name = name
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[Hashable, list]" = OrderedDict()
+        self.rejected = 0
+
+    def take(self, key: Hashable) -> float:
+        """Spend one token for `key`; returns 0 if admitted, else seconds until a token is available"""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(self.burst), now]
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        self.rejected += 1
+        return (1 - bucket[0]) / self.rate
+
+    def stats(self) -> dict:
+        return {"tracked_keys": len(self._buckets), "maxsize": self.maxsize, "rejected": self.rejected}
+
+
+class AdmissionControl:
+    """Cheap checks that run before any database read or bcrypt work.
+
+    Logins are limited per client IP and per account (email), registrations
+    per client IP with buckets of their own, so signing up does not eat into
+    the login allowance; client-credential checks are limited per client ID.
+    All of them are turned
+    away while too many password hashes are already pending, so a flood of
+    attempts cannot queue up enough bcrypt work to starve other traffic.
+    """
+
+    def __init__(self):
+        maxsize = settings.rate_limit_max_keys
+        self.ip = TokenBuckets("ip", settings.login_ip_rate_per_minute, settings.login_ip_burst, maxsize)
+        self.account = TokenBuckets(
+            "account", settings.login_account_rate_per_minute, settings.login_account_burst, maxsize
+        )
+        self.register_ip = TokenBuckets(
+            "register_ip", settings.register_ip_rate_per_minute, settings.register_ip_burst, maxsize
+        )
+        self.client = TokenBuckets(
+            "client", settings.client_credentials_rate_per_minute, settings.client_credentials_burst, maxsize
+        )
+        # endpoint -> (per-IP buckets, per-account buckets or None)
+        self.limits: Dict[str, Tuple[TokenBuckets, Optional[TokenBuckets]]] = {
+            "login": (self.ip, self.account),
+            "register": (self.register_ip, None),
+        }
+
+    @property
+    def max_pending_hashes(self) -> int:
+        # Leave part of the hasher queue for requests that were already admitted
+        return settings.admission_max_pending_hashes or hasher.workers + hasher.max_queue // 2
+
+    def _reject(self, endpoint: str, reason: str, retry_after: float) -> None:
+        admission_rejections.inc(endpoint=endpoint, reason=reason)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts, try again later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    def _check_hash_capacity(self, endpoint: str) -> None:
+        if hasher.queued + hasher.running >= self.max_pending_hashes:
+            self._reject(endpoint, "hash_capacity", 1)
+
+    def admit(self, endpoint: str, request: Optional[Request], account: Optional[str] = None) -> None:
+        """Raise a 429 if this login or registration attempt should not go any further"""
+        ip_buckets, account_buckets = self.limits[endpoint]
+        ip = client_ip(request)
+        if ip is not None:
+            retry_after = ip_buckets.take(ip)
+            if retry_after:
+                self._reject(endpoint, "ip", retry_after)
+        if account and account_buckets is not None:
+            retry_after = account_buckets.take(account.strip().lower())
+            if retry_after:
+                self._reject(endpoint, "account", retry_after)
+        self._check_hash_capacity(endpoint)
+
+    def admit_client(self, client_id: str) -> None:
+        retry_after = self.client.take(client_id)
+        if retry_after:
+            self._reject("client_credentials", "client", retry_after)
+        self._check_hash_capacity("client_credentials")
+
+    def stats(self) -> dict:
+        return {bucket.name: bucket.stats() for bucket in (self.ip, self.account, self.register_ip, self.client)}
+
+
+def client_ip(request: Optional[Request]) -> Optional[str]:
+    if request is None:
+        return None
+    if settings.trust_forwarded_for:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            # The last hop is the one our proxy appended; earlier ones are client-supplied
+            return forwarded.split(",")[-1].strip()
+    return request.client.host if request.client else None
+
+
+admission = AdmissionControl()
\ No newline at end of file
@@ -0,0 +1,73 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Type
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the standard library
+    orjson = None
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), default=_json_default).encode()
+
+
+class RowShape:
+    """The JSON shape of a response model, applied to trusted DB documents.
+
+    Documents read from our own collections already satisfy the model, so
+    instead of validating every row into a model and letting FastAPI
+    validate and serialize it again, rows are cut down to the model's
+    (aliased) keys, missing keys get the model's defaults, and the list is
+    encoded in one go. Only declared fields are ever copied, so fields a
+    model leaves out (password_hash) cannot leak.
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self.keys = [
+            (field.alias or name, field.get_default(call_default_factory=True))
+            for name, field in model.model_fields.items()
+        ]
+
+    @property
+    def projection(self) -> Dict[str, int]:
+        """Mongo projection fetching just the fields this shape needs"""
+        return {key: 1 for key, _ in self.keys}
+
+    def row(self, doc: dict) -> dict:
+        return {key: doc.get(key, default) for key, default in self.keys}
+
+
+_shapes: Dict[Type[BaseModel], RowShape] = {}
+_adapters: Dict[Type[BaseModel], TypeAdapter] = {}
+
+
+def row_shape(model: Type[BaseModel]) -> RowShape:
+    shape = _shapes.get(model)
+    if shape is None:
+        shape = _shapes[model] = RowShape(model)
+    return shape
+
+
+def rows_response(rows: List[dict]) -> Response:
+    """JSON response for rows already cut to a model's shape by RowShape.row"""
+    return Response(content=dumps(rows), media_type="application/json")
+
+
+def models_response(items: Sequence[BaseModel], model: Type[BaseModel]) -> Response:
+    """JSON response for models built by our services, serialized without re-validation"""
+    adapter = _adapters.get(model)
+    if adapter is None:
+        adapter = _adapters[model] = TypeAdapter(List[model])
+    return Response(content=adapter.dump_json(list(items), by_alias=True), media_type="application/json")
\ No newline at end of file
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Compare JWT backends: encode/decode throughput per backend and algorithm.
+
+    python scripts/bench_jwt.py [--iterations 2000] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.auth import JWT_BACKENDS
+from app.utils.keys import SigningKey
+
+ALGORITHMS = ["HS256", "RS256", "ES256", "EdDSA"]
+
+
+def ops_per_sec(fn, iterations: int) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - start)
+
+
+def run(iterations: int) -> list:
+    claims = {
+        "sub": "2f1b6c1e-5d3a-4a8e-9d53-0c2f4f1c9b7a",
+        "email": "user@example.com",
+        "roles": ["user"],
+        "exp": datetime.utcnow() + timedelta(minutes=30),
+    }
+    results = []
+    for backend_name, backend in JWT_BACKENDS.items():
+        try:
+            codec = backend()
+        except ImportError:
+            print(f"Skipping {backend_name}: not installed")
+            continue
+        for algorithm in ALGORITHMS:
+            if algorithm not in codec.algorithms:
+                continue
+            key = SigningKey.generate("bench", algorithm)
+            signing_key = codec.signing_key(key)
+            verification_key = codec.verification_key(key)
+            token = codec.encode(claims, signing_key, algorithm)
+            results.append({
+                "backend": backend_name,
+                "algorithm": algorithm,
+                "encode_ops_per_sec": round(ops_per_sec(lambda: codec.encode(claims, signing_key, algorithm), iterations)),
+                "decode_ops_per_sec": round(ops_per_sec(lambda: codec.decode(token, verification_key, algorithm), iterations)),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.iterations)
+    print(f"{'backend':<8} {'algorithm':<10} {'encode/s':>10} {'decode/s':>10}")
+    for row in results:
+        print(f"{row['backend']:<8} {row['algorithm']:<10} {row['encode_ops_per_sec']:>10} {row['decode_ops_per_sec']:>10}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"iterations": args.iterations, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the primitives every request runs, with regression checks.
+
+    python scripts/bench_primitives.py [--save-baseline] [--baseline bench_baseline.json]
+        [--threshold 15] [--only verify_token] [--json results.json]
+
+Each benchmark runs for several rounds. The best round's time per call, the
+least noisy statistic, is compared against the stored baseline, and the
+script exits with status 1 when any benchmark got slower by more than
+--threshold percent. Baselines are only meaningful on the machine that
+recorded them.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter
+
+from app.models.app import AppResponse
+from app.models.auth import TokenData
+from app.models.user import UserResponse
+from app.utils.auth import (
+    clear_token_cache,
+    create_access_token,
+    create_refresh_token,
+    generate_client_id,
+    generate_client_secret,
+    verify_token,
+)
+from app.utils.keys import key_ring
+
+
+def user_docs(count: int) -> List[dict]:
+    return [
+        {
+            "_id": str(uuid.uuid4()),
+            "email": f"user{i}@example.com",
+            "name": f"User {i}",
+            "roles": ["user"],
+            "created_at": datetime.utcnow(),
+        }
+        for i in range(count)
+    ]
+
+
+def app_docs(count: int) -> List[dict]:
+    return [
+        {
+            "_id": str(uuid.uuid4()),
+            "name": f"App {i}",
+            "client_id": generate_client_id(),
+            "client_secret": "$2b$12$" + "x" * 53,
+            "redirect_uris": ["https://app.example.com/callback"],
+            "description": "Benchmark app",
+            "created_by": str(uuid.uuid4()),
+            "created_at": datetime.utcnow(),
+        }
+        for i in range(count)
+    ]
+
+
+def build_benchmarks(list_size: int) -> Dict[str, Callable[[], object]]:
+    claims = {"sub": str(uuid.uuid4()), "email": "user@example.com", "roles": ["user"]}
+    token = create_access_token(claims)
+
+    def verify_uncached():
+        clear_token_cache()
+        return verify_token(token)
+
+    users = user_docs(list_size)
+    apps = app_docs(list_size)
+    user_list = TypeAdapter(List[UserResponse])
+    app_list = TypeAdapter(List[AppResponse])
+    user_models = user_list.validate_python(users)
+    app_models = app_list.validate_python(apps)
+
+    return {
+        "create_access_token": lambda: create_access_token(claims),
+        "verify_token": verify_uncached,
+        "verify_token_cached": lambda: verify_token(token),
+        "create_refresh_token": create_refresh_token,
+        "generate_client_id": generate_client_id,
+        "generate_client_secret": generate_client_secret,
+        "token_data": lambda: TokenData(user_id=claims["sub"], email=claims["email"], roles=claims["roles"]),
+        f"user_response_validate_x{list_size}": lambda: user_list.validate_python(users),
+        f"user_response_dump_json_x{list_size}": lambda: user_list.dump_json(user_models, by_alias=True),
+        f"app_response_validate_x{list_size}": lambda: app_list.validate_python(apps),
+        f"app_response_dump_json_x{list_size}": lambda: app_list.dump_json(app_models, by_alias=True),
+    }
+
+
+def measure(fn: Callable[[], object], rounds: int, min_round_seconds: float) -> dict:
+    """Median and best time per call in microseconds over `rounds` timed rounds"""
+    fn()  # warm up
+    # Size each round so it runs for at least min_round_seconds
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        if time.perf_counter() - start >= min_round_seconds:
+            break
+        iterations *= 2
+
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        per_call.append((time.perf_counter() - start) / iterations * 1e6)
+    return {
+        "median_us": round(statistics.median(per_call), 3),
+        "min_us": round(min(per_call), 3),
+        "iterations": iterations,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark per-request primitives against a baseline")
+    parser.add_argument("--baseline", default="bench_baseline.json", help="Baseline file to compare with or save to")
+    parser.add_argument("--save-baseline", action="store_true", help="Record this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=15.0, help="Allowed slowdown in percent")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-round-seconds", type=float, default=0.05)
+    parser.add_argument("--list-size", type=int, default=100, help="Items per list for the model benchmarks")
+    parser.add_argument("--only", action="append", help="Run only benchmarks whose name contains this")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    key_ring.load()
+    benchmarks = build_benchmarks(args.list_size)
+    if args.only:
+        benchmarks = {name: fn for name, fn in benchmarks.items() if any(part in name for part in args.only)}
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    regressions = []
+    print(f"{'benchmark':<32} {'min µs':>10} {'median µs':>12} {'baseline':>10} {'change':>9}")
+    for name, fn in benchmarks.items():
+        result = results[name] = measure(fn, args.rounds, args.min_round_seconds)
+        line = f"{name:<32} {result['min_us']:>10} {result['median_us']:>12}"
+        before = baseline.get(name)
+        if before:
+            change = (result["min_us"] - before["min_us"]) / before["min_us"] * 100
+            result["change_pct"] = round(change, 1)
+            marker = ""
+            if change > args.threshold:
+                regressions.append(name)
+                marker = " ❌"
+            line += f" {before['min_us']:>10} {change:>+8.1f}%{marker}"
+        print(line)
+
+    output = {
+        "list_size": args.list_size,
+        "python": sys.version.split()[0],
+        "recorded_at": datetime.utcnow().isoformat(),
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(output, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(output, f, indent=2)
+        print(f"✅ Baseline saved to {args.baseline}")
+        return 0
+    if not baseline:
+        print(f"No baseline at {args.baseline}; record one with --save-baseline")
+        return 0
+    if regressions:
+        print(f"❌ Slower than baseline by more than {args.threshold}%: {', '.join(regressions)}")
+        return 1
+    print(f"✅ No benchmark regressed by more than {args.threshold}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Per-row cost of list responses: the response_model path against the fast path.
+
+    python scripts/bench_serialization.py [--sizes 1000 10000 100000] [--model users|apps] [--json results.json]
+
+"response_model" validates every DB document into a model in the service and
+lets FastAPI validate and serialize the list again, as list endpoints did with
+FAST_SERIALIZATION=false. "fast_rows" cuts documents to the model's shape and
+encodes them directly (GET /users/, GET /apps/); "fast_models" serializes
+service-built models without re-validating them (/sso/dashboard).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import List
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models.app import AppResponse
+from app.models.user import UserResponse
+from app.utils import serialization
+from app.utils.serialization import models_response, row_shape, rows_response
+
+MODELS = {"users": UserResponse, "apps": AppResponse}
+
+
+def documents(dataset: str, count: int) -> List[dict]:
+    now = datetime.utcnow()
+    if dataset == "users":
+        return [
+            {
+                "_id": str(uuid.uuid4()), "email": f"user{i}@example.com", "name": f"User {i}",
+                "roles": ["user"], "password_hash": "$2b$12$" + "x" * 53, "created_at": now,
+            }
+            for i in range(count)
+        ]
+    return [
+        {
+            "_id": str(uuid.uuid4()), "name": f"App {i}", "client_id": uuid.uuid4().hex,
+            "client_secret": "$2b$12$" + "x" * 53, "redirect_uris": ["https://app.example.com/callback"],
+            "description": None, "logo_url": None, "website_url": None,
+            "created_by": str(uuid.uuid4()), "created_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+async def response_model_path(docs: List[dict], model) -> bytes:
+    items = [model(**doc) for doc in docs]
+    field = create_response_field(name="Response", type_=List[model], mode="serialization")
+    content = await serialize_response(field=field, response_content=items)
+    return JSONResponse(content).body
+
+
+async def fast_rows_path(docs: List[dict], model) -> bytes:
+    shape = row_shape(model)
+    return rows_response([shape.row(doc) for doc in docs]).body
+
+
+async def fast_models_path(items: list, model) -> bytes:
+    return models_response(items, model).body
+
+
+def timed(coro_fn, *args) -> float:
+    asyncio.run(coro_fn(*args))  # warm up
+    start = time.perf_counter()
+    asyncio.run(coro_fn(*args))
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare response serialization paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--model", choices=sorted(MODELS), default="users")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    model = MODELS[args.model]
+    encoder = "orjson" if serialization.orjson is not None else "json"
+    print(f"{args.model}, fast rows encoded with {encoder}")
+    print(f"{'rows':>8} {'path':<16} {'total ms':>10} {'µs/row':>8} {'speedup':>8}")
+    results = []
+    for size in args.sizes:
+        docs = documents(args.model, size)
+        models = [model(**doc) for doc in docs]
+        timings = {
+            "response_model": timed(response_model_path, docs, model),
+            "fast_rows": timed(fast_rows_path, docs, model),
+            "fast_models": timed(fast_models_path, models, model),
+        }
+        baseline = timings["response_model"]
+        for path, seconds in timings.items():
+            row = {
+                "rows": size,
+                "path": path,
+                "total_ms": round(seconds * 1000, 2),
+                "us_per_row": round(seconds / size * 1e6, 3),
+                "speedup": round(baseline / seconds, 2),
+            }
+            results.append(row)
+            print(f"{size:>8} {path:<16} {row['total_ms']:>10} {row['us_per_row']:>8} {row['speedup']:>7}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"model": args.model, "encoder": encoder, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Export users, apps or memberships to an NDJSON or CSV file.
+
+    python scripts/export_data.py users --output users.ndjson
+    python scripts/export_data.py memberships --format csv --output members.csv \
+        --created-after 2024-01-01 --resume
+
+The checkpoint after every batch is saved next to the output file
+(<output>.checkpoint); --resume appends from where the last run stopped.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+from datetime import datetime
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import connect_to_mongo, close_mongo_connection
+from app.services.export_service import EXPORT_FIELDS, ExportService, _csv_value, _json_default
+
+
+async def export(args) -> int:
+    checkpoint_path = f"{args.output}.checkpoint"
+    checkpoint = None
+    if args.resume and os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as f:
+            checkpoint = f.read().strip() or None
+
+    await connect_to_mongo()
+    try:
+        export_service = ExportService(args.dataset)
+        fields = export_service.resolve_fields(args.fields.split(",") if args.fields else None)
+        exported = 0
+        with open(args.output, "a" if checkpoint else "w", newline="") as out:
+            writer = csv.writer(out)
+            if args.format == "csv" and not checkpoint:
+                writer.writerow(fields)
+            async for rows, checkpoint in export_service.iter_batches(
+                fields,
+                created_after=args.created_after,
+                created_before=args.created_before,
+                checkpoint=checkpoint,
+                batch_size=args.batch_size,
+            ):
+                for row in rows:
+                    if args.format == "csv":
+                        writer.writerow([_csv_value(row[field]) for field in fields])
+                    else:
+                        out.write(json.dumps(row, default=_json_default) + "\n")
+                out.flush()
+                # Only record progress once the batch is on disk
+                with open(checkpoint_path, "w") as f:
+                    f.write(checkpoint)
+                exported += len(rows)
+        print(f"✅ Exported {exported} {args.dataset} to {args.output}")
+        return 0
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export data to NDJSON or CSV")
+    parser.add_argument("dataset", choices=sorted(EXPORT_FIELDS))
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--fields", help="Comma-separated subset of fields")
+    parser.add_argument("--created-after", type=datetime.fromisoformat)
+    parser.add_argument("--created-before", type=datetime.fromisoformat)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--resume", action="store_true", help="Continue from the saved checkpoint")
+    sys.exit(asyncio.run(export(parser.parse_args())))
\ No newline at end of file
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Bulk-load users from an NDJSON or CSV file.
+
+    python scripts/import_users.py agency.csv [--results results.ndjson]
+
+CSV files need an email,name,password header (roles optional, ';'-separated);
+NDJSON files hold one user object per line.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import connect_to_mongo, close_mongo_connection
+from app.services.user_import_service import UserImportService, parse_user_rows
+from app.utils.hashing import hasher
+
+
+async def import_file(args) -> int:
+    import_format = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+    with open(args.path, "rb") as f:
+        rows = parse_user_rows(f.read(), import_format)
+
+    await connect_to_mongo()
+    await hasher.calibrate()
+    hasher.start()
+    try:
+        report = await UserImportService().import_users(rows)
+    finally:
+        hasher.shutdown()
+        await close_mongo_connection()
+
+    if args.results:
+        with open(args.results, "w") as f:
+            for result in report.results:
+                f.write(result.model_dump_json(exclude_none=True) + "\n")
+    print(
+        f"✅ Created {report.created}, duplicate {report.duplicate}, invalid {report.invalid}, "
+        f"failed {report.failed}"
+    )
+    print(f"   {len(rows)} rows in {report.seconds}s ({report.rows_per_sec} rows/sec)")
+    if report.failed:
+        print("⚠️  Some rows were not attempted; re-run the same file to import them")
+    return 0 if report.invalid == 0 and report.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load users")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["ndjson", "csv"])
+    parser.add_argument("--results", help="Write per-row results as NDJSON")
+    sys.exit(asyncio.run(import_file(parser.parse_args())))
\ No newline at end of file
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Report missing, undeclared and unused indexes, slow query plans and
+lookups that should be covered by an index but fetch documents.
+
+    python scripts/index_report.py [--apply] [--json]
+
+Exits with status 1 when a declared index is missing, a query plan is slow
+or a covered lookup fetches documents.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import connect_to_mongo, close_mongo_connection, get_database
+from app.indexes import ensure_indexes, index_report
+
+
+async def main(apply: bool, as_json: bool) -> int:
+    await connect_to_mongo()
+    try:
+        db = get_database()
+        if apply:
+            failed = await ensure_indexes(db)
+            if failed:
+                print(f"❌ Could not create: {', '.join(failed)}")
+        report = await index_report(db)
+    finally:
+        await close_mongo_connection()
+
+    if as_json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        for section in ("missing", "undeclared", "unused"):
+            print(f"{section.capitalize()} indexes: {', '.join(report[section]) or 'none'}")
+        print("Slow query plans:" if report["slow_plans"] else "Slow query plans: none")
+        for plan in report["slow_plans"]:
+            print(
+                f"   {plan['collection']} {plan['filter']} -> {'/'.join(plan['stages'])}, "
+                f"examined {plan['docs_examined']} for {plan['returned']} in {plan['millis']} ms"
+            )
+        print("Uncovered lookups:" if report["uncovered"] else "Uncovered lookups: none")
+        for plan in report["uncovered"]:
+            print(f"   {plan['collection']} {plan['filter']} {plan['projection']} -> {'/'.join(plan['stages'])}")
+    return 1 if report["missing"] or report["slow_plans"] or report["uncovered"] else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the database against the declared indexes")
+    parser.add_argument("--apply", action="store_true", help="Create missing indexes first")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.apply, args.json)))
\ No newline at end of file
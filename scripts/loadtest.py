@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Replay auth and SSO traffic against the API at fixed arrival rates.
+
+    python scripts/loadtest.py scripts/scenarios/login_storm.json [--base-url http://localhost:8000]
+        [--output results.json] [--compare previous.json] [--rate-scale 2]
+
+Without --base-url the app runs in-process through httpx's ASGI transport
+(it still needs the MongoDB from MONGODB_URL). Arrivals are open-loop: the
+next request starts on schedule whether or not earlier ones have finished,
+so a slow server shows up as latency and errors, not as a lower send rate.
+
+All traffic comes from one IP and setup registers every user from it, while
+login scenarios hit the same accounts over and over, so admission control
+would turn most of it away. The in-process app runs with the limiters in
+LOAD_TEST_LIMITERS disabled (pass --rate-limits to keep them); a server
+given with --base-url needs them set to 0 itself:
+
+    LOGIN_IP_RATE_PER_MINUTE=0 LOGIN_ACCOUNT_RATE_PER_MINUTE=0 REGISTER_IP_RATE_PER_MINUTE=0
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+from jose import jwt
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+
+API = settings.api_v1_str
+PASSWORD = "LoadTest-Passw0rd!"
+PERCENTILES = (50, 90, 95, 99)
+# Admission-control rates that a single-IP load run trips; 0 disables each
+LOAD_TEST_LIMITERS = ("login_ip_rate_per_minute", "login_account_rate_per_minute", "register_ip_rate_per_minute")
+
+
+def git_commit() -> Dict[str, object]:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=root, text=True).strip()
+        dirty = bool(subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root, text=True).strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return round(sorted_values[index], 3)
+
+
+class Session:
+    def __init__(self, email: str, user_id: str, access_token: str, refresh_token: str):
+        self.email = email
+        self.user_id = user_id
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, scenario: dict):
+        self.client = client
+        self.scenario = scenario
+        self.run_id = uuid.uuid4().hex[:8]
+        self.sessions: List[Session] = []
+        # Refresh tokens are single use, so a session is taken out while it is refreshed
+        self.idle_sessions: "asyncio.Queue[Session]" = asyncio.Queue()
+        self.app_ids: List[str] = []
+        self.memberships: Dict[str, List[str]] = {}
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.dropped = 0
+        self._in_flight = 0
+
+    # Setup
+
+    async def register(self, index: int) -> Session:
+        email = f"lt-{self.run_id}-{index}@loadtest.example.com"
+        response = await self.client.post(
+            f"{API}/auth/register", json={"email": email, "password": PASSWORD, "name": f"Load test {index}"}
+        )
+        response.raise_for_status()
+        tokens = response.json()
+        user_id = jwt.get_unverified_claims(tokens["access_token"])["sub"]
+        return Session(email, user_id, tokens["access_token"], tokens["refresh_token"])
+
+    async def setup(self) -> None:
+        setup = self.scenario.get("setup", {})
+        users = setup.get("users", 50)
+        concurrency = asyncio.Semaphore(setup.get("concurrency", 16))
+
+        async def register(index: int) -> Session:
+            async with concurrency:
+                return await self.register(index)
+
+        self.sessions = list(await asyncio.gather(*(register(i) for i in range(users))))
+        for session in self.sessions:
+            self.idle_sessions.put_nowait(session)
+
+        owner = self.sessions[0]
+        per_user = setup.get("apps_per_user", 0)
+        for i in range(setup.get("apps", 0)):
+            response = await self.client.post(
+                f"{API}/apps/",
+                json={"name": f"Load test app {self.run_id}-{i}", "redirect_uris": ["https://loadtest.example.com/callback"]},
+                headers=owner.headers,
+            )
+            response.raise_for_status()
+            self.app_ids.append(response.json()["_id"])
+        if not self.app_ids or not per_user:
+            return
+
+        members = defaultdict(list)
+        for session in self.sessions:
+            apps = random.sample(self.app_ids, min(per_user, len(self.app_ids)))
+            self.memberships[session.user_id] = apps
+            for app_id in apps:
+                members[app_id].append(session.user_id)
+        for app_id, user_ids in members.items():
+            response = await self.client.post(
+                f"{API}/apps/{app_id}/users/bulk",
+                json={"add": [{"user_id": user_id, "roles": ["viewer"]} for user_id in user_ids]},
+                headers=owner.headers,
+            )
+            response.raise_for_status()
+
+    # Actions
+
+    async def action_login(self, options: dict) -> httpx.Response:
+        session = random.choice(self.sessions)
+        return await self.client.post(f"{API}/auth/login", json={"email": session.email, "password": PASSWORD})
+
+    async def action_refresh(self, options: dict) -> Optional[httpx.Response]:
+        try:
+            session = self.idle_sessions.get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+        try:
+            response = await self.client.post(f"{API}/token/refresh", json={"refresh_token": session.refresh_token})
+            if response.status_code == 200:
+                tokens = response.json()
+                session.access_token = tokens["access_token"]
+                session.refresh_token = tokens["refresh_token"]
+            return response
+        finally:
+            self.idle_sessions.put_nowait(session)
+
+    async def action_verify(self, options: dict) -> httpx.Response:
+        session = random.choice(self.sessions)
+        return await self.client.post(f"{API}/token/verify", json={"token": session.access_token})
+
+    async def action_verify_batch(self, options: dict) -> httpx.Response:
+        batch = [random.choice(self.sessions).access_token for _ in range(options.get("batch_size", 50))]
+        return await self.client.post(f"{API}/token/verify/batch", json={"tokens": batch})
+
+    async def action_me(self, options: dict) -> httpx.Response:
+        return await self.client.get(f"{API}/auth/me", headers=random.choice(self.sessions).headers)
+
+    async def action_dashboard(self, options: dict) -> httpx.Response:
+        return await self.client.get(f"{API}/sso/dashboard", headers=random.choice(self.sessions).headers)
+
+    async def action_launch(self, options: dict) -> httpx.Response:
+        session = random.choice(self.sessions)
+        app_ids = self.memberships.get(session.user_id) or self.app_ids
+        return await self.client.get(f"{API}/sso/launch/{random.choice(app_ids)}", headers=session.headers)
+
+    async def action_app_members(self, options: dict) -> httpx.Response:
+        return await self.client.get(
+            f"{API}/apps/{random.choice(self.app_ids)}/users",
+            params={"limit": options.get("limit", 100)},
+            headers=self.sessions[0].headers,
+        )
+
+    # Running
+
+    async def _fire(self, name: str, options: dict) -> None:
+        self._in_flight += 1
+        start = time.perf_counter()
+        try:
+            response = await getattr(self, f"action_{name}")(options)
+            status = "no_session" if response is None else str(response.status_code)
+        except Exception as e:
+            # Transport errors, and app exceptions re-raised by the in-process ASGI transport
+            status = type(e).__name__
+        finally:
+            self._in_flight -= 1
+        self.latencies[name].append((time.perf_counter() - start) * 1000)
+        self.statuses[name][status] += 1
+
+    async def run(self, rate_scale: float = 1.0) -> float:
+        mix = self.scenario["mix"]
+        names = [entry["action"] for entry in mix]
+        weights = [entry.get("weight", 1) for entry in mix]
+        options = {entry["action"]: entry for entry in mix}
+        max_in_flight = self.scenario.get("max_in_flight", 1000)
+        tasks = set()
+        started = time.perf_counter()
+        for phase in self.scenario["phases"]:
+            rate = phase["rate"] * rate_scale
+            phase_end = time.perf_counter() + phase["duration_seconds"]
+            next_at = time.perf_counter()
+            while True:
+                # Poisson arrivals at `rate` requests per second
+                next_at += random.expovariate(rate)
+                if next_at >= phase_end:
+                    break
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if self._in_flight >= max_in_flight:
+                    self.dropped += 1
+                    continue
+                name = random.choices(names, weights)[0]
+                task = asyncio.create_task(self._fire(name, options[name]))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.sleep(max(0.0, phase_end - time.perf_counter()))
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - started
+
+    def summary(self, elapsed: float) -> dict:
+        actions = {}
+        for name, latencies in sorted(self.latencies.items()):
+            ordered = sorted(latencies)
+            statuses = self.statuses[name]
+            errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+            actions[name] = {
+                "requests": len(ordered),
+                "throughput_per_sec": round(len(ordered) / elapsed, 2),
+                "error_rate": round(errors / len(ordered), 4),
+                "statuses": dict(statuses),
+                **{f"p{pct}_ms": percentile(ordered, pct) for pct in PERCENTILES},
+                "max_ms": round(ordered[-1], 3),
+                "mean_ms": round(sum(ordered) / len(ordered), 3),
+            }
+        total = sum(action["requests"] for action in actions.values())
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "requests": total,
+            "throughput_per_sec": round(total / elapsed, 2) if elapsed else 0.0,
+            "dropped_client_side": self.dropped,
+            "actions": actions,
+        }
+
+
+def print_summary(summary: dict, previous: Optional[dict]) -> None:
+    print(
+        f"\n📊 {summary['requests']} requests in {summary['elapsed_seconds']}s "
+        f"({summary['throughput_per_sec']}/s), {summary['dropped_client_side']} dropped client-side"
+    )
+    header = f"{'action':<14}{'count':>8}{'rps':>9}{'err%':>8}" + "".join(f"{f'p{p}':>10}" for p in PERCENTILES) + f"{'max':>10}"
+    print(header)
+    for name, action in summary["actions"].items():
+        line = f"{name:<14}{action['requests']:>8}{action['throughput_per_sec']:>9}{action['error_rate'] * 100:>8.2f}"
+        line += "".join(f"{action[f'p{p}_ms']:>10}" for p in PERCENTILES) + f"{action['max_ms']:>10}"
+        print(line)
+        before = (previous or {}).get("actions", {}).get(name)
+        if before and before.get("p99_ms"):
+            change = (action["p99_ms"] - before["p99_ms"]) / before["p99_ms"] * 100
+            print(f"{'':<14}p99 {before['p99_ms']} -> {action['p99_ms']} ms ({change:+.1f}%)")
+
+
+async def main(args) -> int:
+    with open(args.scenario) as f:
+        scenario = json.load(f)
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+        lifespan = None
+    else:
+        if not args.rate_limits:
+            # Must happen before the app (and its admission controller) is imported
+            for name in LOAD_TEST_LIMITERS:
+                setattr(settings, name, 0)
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=args.timeout)
+        lifespan = app.router.lifespan_context(app)
+
+    if lifespan is not None:
+        await lifespan.__aenter__()
+    try:
+        async with client:
+            test = LoadTest(client, scenario)
+            print(f"⏳ Setting up scenario {scenario['name']} (run {test.run_id})...")
+            await test.setup()
+            print(f"🚀 Running {len(scenario['phases'])} phase(s)...")
+            elapsed = await test.run(args.rate_scale)
+    finally:
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+
+    result = {
+        "scenario": scenario["name"],
+        "target": args.base_url or "in-process",
+        "rate_scale": args.rate_scale,
+        "started_at": datetime.utcnow().isoformat(),
+        **git_commit(),
+        "settings": {"bcrypt_rounds": settings.bcrypt_rounds, "jwt_backend": settings.jwt_backend, "algorithm": settings.algorithm},
+        **test.summary(elapsed),
+    }
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    print_summary(result, previous)
+
+    output = args.output or f"loadtest-{scenario['name']}-{(result['commit'] or 'nogit')[:8]}.json"
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"✅ Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a load-test scenario against the API")
+    parser.add_argument("scenario", help="Scenario JSON file (see scripts/scenarios/)")
+    parser.add_argument("--base-url", help="Target a running server instead of the in-process app")
+    parser.add_argument("--output", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Earlier results file to compare p99 latencies with")
+    parser.add_argument("--rate-scale", type=float, default=1.0, help="Multiply every phase's arrival rate")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--rate-limits", action="store_true", help="Keep admission control on for the in-process app")
+    sys.exit(asyncio.run(main(parser.parse_args())))
\ No newline at end of file